@@ -1,12 +1,14 @@
 """LangGraph Document Agent."""
 
-import os
+from app.config.settings import settings
+from app.core.llm_http import llm_http_kwargs
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from app.core.embeddings.bge3_generator import bge3_generator
-from pydantic import BaseModel
+from dataclasses import dataclass
 
-class DocumentState(BaseModel):
+@dataclass(slots=True)
+class DocumentState:
     file_path: str
     vector_store: str = ""
     status: str = "pending"
@@ -26,9 +28,10 @@ class DocumentProcessingAgent:
                 self.phi4_llm = AzureChatOpenAI(
                     model="phi-4",
                     temperature=0.1,
-                    azure_endpoint=os.getenv("AZURE_AI_ENDPOINT"),
-                    api_key=os.getenv("AZURE_AI_API_KEY"),
-                    api_version=os.getenv("AZURE_AI_API_VERSION")
+                    azure_endpoint=settings.AZURE_AI_ENDPOINT,
+                    api_key=settings.AZURE_AI_API_KEY,
+                    api_version=settings.AZURE_AI_API_VERSION,
+                    **llm_http_kwargs()
                 )
             return self.phi4_llm
         except Exception:
@@ -36,7 +39,8 @@ class DocumentProcessingAgent:
                 self.backup_llm = ChatOpenAI(
                     model="gpt-4o-mini", 
                     temperature=0.1,
-                    api_key=os.getenv("OPENAI_API_KEY")
+                    api_key=settings.OPENAI_API_KEY,
+                    **llm_http_kwargs()
                 )
             return self.backup_llm
     
@@ -65,29 +69,20 @@ class DocumentProcessingAgent:
         try:
             # Parse document content
             from app.core.document.parser import DocumentParser
+            from app.models.document import DocumentFormat
             from app.core.vector_store.store_manager import store_manager
+            from app.core.embeddings.pipeline import embed_lines_batched
             
             parser = DocumentParser()
             lines = parser.parse_document(state.file_path)
+            # Same document_type values the upload endpoint stores: 'pdf', else extracted 'text'
+            document_type = 'pdf' if parser.detect_format(state.file_path) == DocumentFormat.PDF else 'text'
             
-            # Generate embeddings and store
+            # Generate embeddings in batches and store every line
             store = store_manager.get_store(state.vector_store)
-            embeddings_data = []
+            lines_stored = await embed_lines_batched(store, lines, state.file_path, document_type)
             
-            for i, line in enumerate(lines[:10]):  # Limit to first 10 lines for now
-                if line.strip():
-                    embedding = self.embeddings.generate_single_embedding(line)
-                    embeddings_data.append({
-                        'content': line,
-                        'embedding': embedding.tolist(),
-                        'metadata': {'line_number': i, 'filename': state.file_path}
-                    })
-            
-            if embeddings_data:
-                await store.insert_embeddings(embeddings_data)
-                state.status = "completed"
-            else:
-                state.status = "failed"
+            state.status = "completed" if lines_stored else "failed"
                 
         except Exception as e:
             state.status = "failed"
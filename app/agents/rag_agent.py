@@ -1,12 +1,14 @@
 """LangGraph RAG Agent."""
 
-import os
+from app.config.settings import settings
+from app.core.llm_http import llm_http_kwargs
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from app.core.embeddings.bge3_generator import bge3_generator
-from pydantic import BaseModel
+from dataclasses import dataclass
 
-class RAGState(BaseModel):
+@dataclass(slots=True)
+class RAGState:
     query: str
     confidence: float = 0.0
     response: str = ""
@@ -14,32 +16,35 @@ class RAGState(BaseModel):
 
 class AgenticRAGSystem:
     def __init__(self):
-        self.phi4_llm = None
-        self.backup_llm = None
+        self.llms = {}  # use_smart -> cached client
         self.graph = self._build_graph()
     
     def _get_llm(self, use_smart=False):
-        """Get LLM with Phi-4 primary, OpenAI backup."""
+        """Get cached LLM for the requested tier, building it on first use."""
+        if use_smart not in self.llms:
+            self.llms[use_smart] = self._build_llm(use_smart)
+        return self.llms[use_smart]
+    
+    def _build_llm(self, use_smart: bool):
+        """Build LLM with Phi-4 primary, OpenAI backup."""
         try:
-            if self.phi4_llm is None:
-                from langchain_openai import AzureChatOpenAI
-                self.phi4_llm = AzureChatOpenAI(
-                    model="phi-4",
-                    temperature=0.1 if not use_smart else 0.2,
-                    azure_endpoint=os.getenv("AZURE_AI_ENDPOINT"),
-                    api_key=os.getenv("AZURE_AI_API_KEY"),
-                    api_version=os.getenv("AZURE_AI_API_VERSION")
-                )
-            return self.phi4_llm
+            from langchain_openai import AzureChatOpenAI
+            return AzureChatOpenAI(
+                model="phi-4",
+                temperature=0.1 if not use_smart else 0.2,
+                azure_endpoint=settings.AZURE_AI_ENDPOINT,
+                api_key=settings.AZURE_AI_API_KEY,
+                api_version=settings.AZURE_AI_API_VERSION,
+                **llm_http_kwargs()
+            )
         except Exception:
-            if self.backup_llm is None:
-                model = "gpt-4o" if use_smart else "gpt-4o-mini"
-                self.backup_llm = ChatOpenAI(
-                    model=model, 
-                    temperature=0.1 if not use_smart else 0.2,
-                    api_key=os.getenv("OPENAI_API_KEY")
-                )
-            return self.backup_llm
+            model = "gpt-4o" if use_smart else "gpt-4o-mini"
+            return ChatOpenAI(
+                model=model, 
+                temperature=0.1 if not use_smart else 0.2,
+                api_key=settings.OPENAI_API_KEY,
+                **llm_http_kwargs()
+            )
     
     def _build_graph(self):
         workflow = StateGraph(RAGState)
@@ -79,9 +84,9 @@ class AgenticRAGSystem:
     async def process_query(self, query: str):
         result = await self.graph.ainvoke(RAGState(query=query))
         return {
-            "response": result.response,
-            "confidence": result.confidence,
-            "llm_used": result.llm_used
+            "response": result["response"],
+            "confidence": result["confidence"],
+            "llm_used": result["llm_used"]
         }
 
 rag_agent = AgenticRAGSystem()
\ No newline at end of file
@@ -1,21 +1,44 @@
 """Chat endpoint for simple Q&A."""
 
+import asyncio
+import json
 import time
+from functools import lru_cache
+from async_lru import alru_cache
+from cachetools import LRUCache
 from fastapi import APIRouter
 from app.models.chat import ChatRequest  # , FeedbackRequest
 from app.models.query import QueryResponse
 # from app.core.memory.chat_memory import chat_memory  # Commented out for now
 from langchain_openai import ChatOpenAI
-import os
-from dotenv import load_dotenv
+from app.config.settings import settings
+from app.core.llm_http import llm_http_kwargs
 
-load_dotenv()
+@lru_cache(maxsize=None)
+def _get_fast_llm() -> ChatOpenAI:
+    """Build the gpt-4o-mini client once and reuse it across requests."""
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0.1, openai_api_key=settings.OPENAI_API_KEY,
+                      **llm_http_kwargs())
+
+# Enhanced queries keyed by normalized text, so case/whitespace variants share one LLM call
+_enhanced_queries: LRUCache = LRUCache(maxsize=4096)
 
 async def enhance_query(query: str) -> str:
     """Enhance query with spelling correction and better search terms."""
-    try:
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, openai_api_key=os.getenv("OPENAI_API_KEY"))
-        prompt = f"""Fix spelling mistakes and enhance this query for legal document search:
+    key = query.strip().lower()
+    enhanced = _enhanced_queries.get(key)
+    if enhanced is None:
+        try:
+            enhanced = await _llm_enhance_query(query.strip())
+        except Exception:
+            return query  # Failures are not cached
+        _enhanced_queries[key] = enhanced
+    return enhanced if enhanced and len(enhanced) > 5 else query
+
+async def _llm_enhance_query(query: str) -> str:
+    """LLM query enhancement; the prompt gets the query as the user wrote it."""
+    llm = _get_fast_llm()
+    prompt = f"""Fix spelling mistakes and enhance this query for legal document search:
 
 Original: "{query}"
 
@@ -27,16 +50,13 @@ Rules:
 5. Make it more searchable
 
 Return ONLY the corrected and enhanced query:"""
-        response = llm.invoke(prompt)
-        enhanced = response.content.strip().strip('"').strip("'")
-        return enhanced if enhanced and len(enhanced) > 5 else query
-    except Exception:
-        return query
+    response = await llm.ainvoke(prompt)
+    return response.content.strip().strip('"').strip("'")
 
 async def generate_format_specific_answer(query: str, context: str, response_format: str, original_query: str = "") -> tuple[str, str]:
     """Generate two different answers: precise (short) and detailed (full)."""
     try:
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, openai_api_key=os.getenv("OPENAI_API_KEY"))
+        llm = _get_fast_llm()
         display_query = original_query or query
         
         # Generate PRECISE answer (always short)
@@ -100,9 +120,11 @@ Format:
 
 Concise Answer:"""
         
-        # Generate both answers
-        precise_response = llm.invoke(precise_prompt)
-        detailed_response = llm.invoke(detailed_prompt)
+        # Generate both answers concurrently
+        precise_response, detailed_response = await asyncio.gather(
+            llm.ainvoke(precise_prompt),
+            llm.ainvoke(detailed_prompt)
+        )
         
         precise_answer = precise_response.content.strip()
         detailed_answer = detailed_response.content.strip()
@@ -112,6 +134,55 @@ Concise Answer:"""
     except Exception as e:
         error_msg = f"Unable to process query: {str(e)}"
         return error_msg, error_msg
+
+DETAILED_FORMAT_RULES = {
+    "structured": "organized bullet points using • for main points and   - for sub-bullet details, including procedures, steps and requirements",
+    "descriptive": "a comprehensive 3-5 sentence explanation with background, context, implications and consequences",
+    "concise": "a complete but concise 2-3 sentence answer with all key information and more detail than the precise answer"
+}
+
+async def generate_combined_answer(query: str, context: str, response_format: str, original_query: str = "") -> tuple[str, str]:
+    """Generate precise and detailed answers in a single JSON-mode LLM call."""
+    try:
+        return await _generate_json_answers(query, context, response_format, original_query)
+    except Exception:
+        # Fall back to separate precise/detailed calls
+        return await generate_format_specific_answer(query, context, response_format, original_query)
+
+@alru_cache(maxsize=1024, ttl=900)
+async def _generate_json_answers(query: str, context: str, response_format: str, original_query: str) -> tuple[str, str]:
+    """JSON-mode answer generation, cached per (query, context, format) for 15 minutes.
+    
+    The retrieved context is part of the key, so newly ingested documents are
+    picked up as soon as they change what the search returns.
+    """
+    llm = _get_fast_llm()
+    json_llm = llm.bind(response_format={"type": "json_object"})
+    display_query = original_query or query
+    detailed_rules = DETAILED_FORMAT_RULES.get(response_format, DETAILED_FORMAT_RULES["concise"])
+    
+    prompt = f"""Answer this question from the context and return a JSON object with exactly two string fields.
+
+Question: "{display_query}"
+
+Context: {context}
+
+Fields:
+- "precise": ONLY the key facts in 1-2 sentences, direct answer with no explanations or background
+- "detailed": {detailed_rules}
+
+Return ONLY the JSON object:"""
+    
+    response = await json_llm.ainvoke(prompt)
+    answers = json.loads(response.content)
+    precise_answer = str(answers.get("precise", "")).strip()
+    detailed_answer = str(answers.get("detailed", "")).strip()
+    
+    if not precise_answer or not detailed_answer:
+        raise ValueError("Incomplete JSON answer")
+    
+    return precise_answer, detailed_answer
+
 from app.core.vector_store.store_manager import store_manager
 from app.core.embeddings.bge3_generator import bge3_generator
 
@@ -130,11 +201,9 @@ async def chat_message(request: ChatRequest):
         
         # Search documents with enhanced query
         store = store_manager.get_store("documents")
-        embedding = bge3_generator.generate_single_embedding(enhanced_query)
-        results = await store.search(embedding, top_k=15)
-        
-        # Filter results by relevance
-        filtered_results = [r for r in results if r.get('similarity', 0) > 0.3]
+        embedding = await asyncio.to_thread(bge3_generator.generate_single_embedding, enhanced_query)
+        # Relevance filter is applied inside the search query
+        filtered_results = await store.search(embedding, top_k=15, min_similarity=0.3)
         
         # Generate answer with context
         if filtered_results:
@@ -148,7 +217,7 @@ async def chat_message(request: ChatRequest):
                 context_parts.append(f"{doc_info}\n{r['content']}")
             
             document_context = "\n\n".join(context_parts)
-            precise_answer, detailed_answer = await generate_format_specific_answer(
+            precise_answer, detailed_answer = await generate_combined_answer(
                 enhanced_query, document_context, request.response_format, request.query
             )
         else:
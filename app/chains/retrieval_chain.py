@@ -4,11 +4,13 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_community.embeddings import SentenceTransformerEmbeddings
+from app.config.settings import settings
+from app.core.llm_http import llm_http_kwargs
 
 class HNSWRetrievalChain:
     def __init__(self):
         self.embeddings = SentenceTransformerEmbeddings(model_name="BAAI/bge-large-en-v1.5")
-        self.llm = ChatOpenAI(model="gpt-4")
+        self.llm = ChatOpenAI(model="gpt-4", api_key=settings.OPENAI_API_KEY, **llm_http_kwargs())
         
         self.prompt = ChatPromptTemplate.from_template(
             "Context: {context}\nQuestion: {question}\nAnswer:"
@@ -17,15 +17,25 @@ class Settings(BaseSettings):
         encoded_password = quote_plus(self.DB_PASSWORD)
         return f"postgresql://{self.DB_USER}:{encoded_password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    # Connection pool shared by all vector stores
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_COMMAND_TIMEOUT: float = 60
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300  # Seconds before an idle connection is closed
+    
     # BGE-3 Configuration  
     BGE_MODEL_NAME: str = "BAAI/bge-large-en-v1.5"
     EMBEDDING_DIMENSION: int = 1024
     BATCH_SIZE: int = 64
+    EMBEDDING_ONNX_INT8: bool = False  # CPU only: int8-quantized ONNX Runtime encoder
+    EMBEDDING_ONNX_DIR: str = "models/onnx"  # Cache for the one-time export
     
     # HNSW Parameters
     HNSW_M: int = 16
     HNSW_EF_CONSTRUCTION: int = 200
     HNSW_EF_SEARCH: int = 100
+    HNSW_HALFVEC: bool = False  # Index embeddings as halfvec (pgvector >= 0.7); heap keeps fp32 for reranking
+    HNSW_RERANK_FACTOR: int = 3  # halfvec candidates fetched per result before the fp32 rerank
     
     # LLM Configuration (Phi-4 primary, OpenAI backup)
     AZURE_AI_ENDPOINT: str = ""
@@ -38,6 +48,14 @@ class Settings(BaseSettings):
     MAX_RESULTS: int = 50
     BATCH_SIZE_UPLOAD: int = 50
     BATCH_SIZE_EMBEDDING: int = 32
+    UPLOAD_BATCH_CONCURRENCY: int = 8  # Concurrent embed+insert batches per file
+    UPLOAD_FILE_CONCURRENCY: int = 4  # Files processed concurrently per upload
+    
+    # In-memory embedding cache (brute-force search, suited to < ~500k vectors).
+    # Each process keeps its own copy and only sees its own inserts, so it is
+    # turned off when Gunicorn runs more than one worker
+    RAG_CACHE_ENABLED: bool = False
+    RAG_CACHE_DTYPE: str = "float16"  # float16 halves scan bandwidth; float32 for exact scores
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 25
@@ -48,6 +66,17 @@ class Settings(BaseSettings):
     LEGAL_MEDIUM_PRECISION: float = 0.3
     LEGAL_MINIMUM: float = 0.25
     
+    # PDF Extraction
+    PDF_PAGE_WORKERS: int = 0  # OCR processes shared by all uploads; 0 = one per usable CPU, 1 = in-process
+    PDF_MAX_PAGES: int = 0  # Pages extracted per upload; 0 = no limit
+    PDF_MAX_CHARS: int = 0  # Stop extracting once this much text is collected; 0 = no limit
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"  # DEBUG adds per-batch upload status
+    
+    # Readiness probe files ("<READY_FILE>.<pid>" per worker), present while warmed up and serving; empty disables
+    READY_FILE: str = "/tmp/ready"
+    
     # Context Window Settings
     CONTEXT_WINDOW_SIZE: int = 3  # Lines before/after for context
     MAX_CONTEXT_LENGTH: int = 2000  # Max characters in context
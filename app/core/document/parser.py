@@ -6,6 +6,12 @@ from pathlib import Path
 from typing import List, Dict, Any
 from app.models.document import DocumentFormat
 
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
 class DocumentParser:
     @staticmethod
     def detect_format(filename: str) -> DocumentFormat:
@@ -50,6 +56,14 @@ class DocumentParser:
     
     def _parse_pdf(self, file_path: str) -> str:
         """Parse PDF document."""
+        if PDFIUM_AVAILABLE:
+            # PDFium's native text layer is several times faster than PyPDF2
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return "\n".join(page.get_textpage().get_text_range() for page in pdf)
+            finally:
+                pdf.close()
+        
         with open(file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
             return "\n".join(page.extract_text() for page in reader.pages)
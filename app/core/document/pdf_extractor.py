@@ -2,11 +2,21 @@
 
 import PyPDF2
 import pdfplumber
+from pdfminer.high_level import extract_text as pdfminer_extract_text
+from pdfminer.layout import LAParams
 import io
+import os
 import warnings
 import logging
+import multiprocessing
 import sys
-from typing import List
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+from app.config.settings import settings
 
 # Complete warning suppression
 warnings.filterwarnings("ignore")
@@ -16,14 +26,36 @@ logging.getLogger("PyPDF2").setLevel(logging.CRITICAL)
 
 # Redirect stderr temporarily during PDF processing
 class SuppressOutput:
+    """Silence stderr around individual parser calls.
+    
+    sys.stderr is process-wide and several uploads extract on worker threads,
+    so the swap is reference-counted under a lock: the first block to enter
+    redirects it and the last one to leave restores it. Never hold one across
+    a yield.
+    """
+    _lock = threading.Lock()
+    _depth = 0
+    _original_stderr = None
+    _devnull = None
+    
     def __enter__(self):
-        self._original_stderr = sys.stderr
-        sys.stderr = open('nul' if sys.platform == 'win32' else '/dev/null', 'w')
+        cls = SuppressOutput
+        with cls._lock:
+            if cls._depth == 0:
+                cls._original_stderr = sys.stderr
+                cls._devnull = open('nul' if sys.platform == 'win32' else '/dev/null', 'w')
+                sys.stderr = cls._devnull
+            cls._depth += 1
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stderr.close()
-        sys.stderr = self._original_stderr
+        cls = SuppressOutput
+        with cls._lock:
+            cls._depth -= 1
+            if cls._depth == 0:
+                sys.stderr = cls._original_stderr
+                cls._devnull.close()
+                cls._original_stderr = cls._devnull = None
 try:
     import pytesseract
     from PIL import Image
@@ -32,6 +64,21 @@ except ImportError:
     OCR_AVAILABLE = False
     print("OCR not available. Install pytesseract and Pillow for image text extraction.")
 
+try:
+    from tesserocr import PyTessBaseAPI, OEM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# PDFium is not thread-safe, and uploads extract several PDFs on worker threads
+_PDFIUM_LOCK = threading.Lock()
+
 try:
     import camelot
     import warnings
@@ -40,148 +87,448 @@ try:
 except ImportError:
     CAMELOT_AVAILABLE = False
 
+# One persistent Tesseract engine per thread (the API is not thread-safe)
+_tesseract_local = threading.local()
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on, which is fewer than os.cpu_count() when pinned."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def _tesseract_api():
+    """Return this thread's tesserocr engine, loading the language model on first use."""
+    api = getattr(_tesseract_local, "api", None)
+    if api is None:
+        api = _tesseract_local.api = PyTessBaseAPI(oem=OEM.LSTM_ONLY)
+        api.SetVariable("tessedit_do_invert", "0")
+    return api
+
+def _tesseract_text(image, psm: int) -> str:
+    """OCR an image in-process with tesserocr when installed, else via a pytesseract subprocess."""
+    if TESSEROCR_AVAILABLE:
+        api = _tesseract_api()
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(image, config=f'--psm {psm} --oem 1 -c tessedit_do_invert=0')
+
+def _open_render_document(pdf_bytes: bytes):
+    """Open the PDFium handle used to rasterize pages for OCR, or None without PDFium/OCR."""
+    if not (OCR_AVAILABLE and PDFIUM_AVAILABLE):
+        return None
+    try:
+        with _PDFIUM_LOCK:
+            return pdfium.PdfDocument(pdf_bytes)
+    except Exception:
+        return None
+
+def _close_render_document(render_pdf) -> None:
+    """Release a handle from _open_render_document."""
+    if render_pdf is not None:
+        with _PDFIUM_LOCK:
+            render_pdf.close()
+
+# OCR process pool shared by every upload, created on first use and shut down with the app
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def _ocr_workers() -> int:
+    """OCR processes for the shared pool; 1 means OCR runs on the extracting thread."""
+    return settings.PDF_PAGE_WORKERS or _usable_cpus()
+
+def _get_ocr_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared OCR pool, starting it on first use, or None when OCR stays in-process."""
+    global _ocr_pool
+    if not OCR_AVAILABLE or _ocr_workers() <= 1:
+        return None
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # spawn, not fork: the server process already runs torch and event loop threads
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=_ocr_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker
+            )
+        return _ocr_pool
+
+def _discard_ocr_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next upload starts a fresh one."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_ocr_pool() -> None:
+    """Stop the shared OCR processes; called from the app lifespan on shutdown."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _init_ocr_worker() -> None:
+    """Keep Tesseract single-threaded and load its model once per OCR process."""
+    # Tesseract's OpenMP threads would otherwise fight the other pool processes
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if TESSEROCR_AVAILABLE:
+        _tesseract_api()
+
+def _ocr_bitmap(mode: str, size: Tuple[int, int], data: bytes) -> str:
+    """OCR a raw page bitmap inside an OCR pool process."""
+    return PDFExtractor._ocr_image(Image.frombytes(mode, size, data))
+
 class PDFExtractor:
-    def extract_text_from_bytes(self, pdf_bytes: bytes) -> str:
-        """Optimized PDF extraction - fast processing with table/OCR support."""
-        full_text = ""
+    def extract_text_from_bytes(self, pdf_bytes: bytes, max_pages: Optional[int] = None,
+                                max_chars: Optional[int] = None) -> str:
+        """Optimized PDF extraction - fast processing with table/OCR support.
+        
+        max_pages / max_chars stop extraction early on oversized documents.
+        """
+        try:
+            parts = list(self._limit_chars(self.iter_page_texts(pdf_bytes, max_pages), max_chars))
+            full_text = "".join(parts)
+        except Exception as e:
+            return f"Error extracting PDF: {str(e)}"
+        
+        return full_text if full_text.strip() else "No extractable content found in PDF"
+    
+    def iter_page_lines_from_bytes(self, pdf_bytes: bytes, max_pages: Optional[int] = None,
+                                   max_chars: Optional[int] = None) -> Iterator[List[str]]:
+        """Stream each page's meaningful lines instead of buffering the whole document."""
+        page_texts = self._limit_chars(self.iter_page_texts(pdf_bytes, max_pages), max_chars)
+        try:
+            for page_text in page_texts:
+                page_lines = list(self._iter_clean_lines(page_text))
+                if page_lines:
+                    yield page_lines
+        finally:
+            page_texts.close()  # Stop extraction as soon as the caller stops reading
+    
+    @staticmethod
+    def _limit_chars(page_texts: Iterator[str], max_chars: Optional[int]) -> Iterator[str]:
+        """Pass pages through until max_chars characters have been yielded."""
+        total = 0
+        try:
+            for page_text in page_texts:
+                yield page_text
+                total += len(page_text)
+                if max_chars and total >= max_chars:
+                    return
+        finally:
+            page_texts.close()  # Stop extraction promptly
+    
+    def iter_page_texts(self, pdf_bytes: bytes, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Yield the text of every page with extractable content, in page order."""
+        pages_yielded = 0
         
         try:
             pdf_file = io.BytesIO(pdf_bytes)
             
-            with SuppressOutput(), pdfplumber.open(pdf_file) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = f"\n--- Page {page_num + 1} ---\n"
-                    content_found = False
-                    
-                    # Step 1: Enhanced text extraction with multiple methods
-                    text = page.extract_text(layout=True, x_tolerance=3, y_tolerance=3)
-                    if not text or len(text.strip()) < 10:
-                        text = page.extract_text()  # Fallback to basic extraction
-                    
-                    if text and text.strip() and len(text.strip()) > 5:
-                        page_text += text + "\n"
-                        content_found = True
-                        print(f"Page {page_num + 1}: Text content extracted")
-                    
-                    # Step 2: Enhanced table extraction with multiple strategies
-                    try:
-                        # Strategy 1: Standard table extraction
-                        tables = page.extract_tables(table_settings={
-                            "vertical_strategy": "lines_strict",
-                            "horizontal_strategy": "lines_strict",
-                            "snap_tolerance": 3,
-                            "join_tolerance": 3
-                        })
-                        
-                        if not tables:
-                            # Strategy 2: Text-based table detection
-                            tables = page.extract_tables(table_settings={
-                                "vertical_strategy": "text",
-                                "horizontal_strategy": "text"
-                            })
-                        
-                        if tables:
-                            for table in tables:
-                                for row in table:
-                                    if row and any(cell for cell in row if cell):
-                                        row_text = " | ".join(str(cell or "").strip() for cell in row)
-                                        if row_text.strip():
-                                            page_text += row_text + "\n"
-                            content_found = True
-                            print(f"Page {page_num + 1}: Table content extracted")
-                    except Exception:
-                        pass
-                    
-                    # Step 2.5: Advanced Camelot table extraction if available
-                    if not content_found and CAMELOT_AVAILABLE:
-                        try:
-                            camelot_text = self.extract_with_camelot_page(pdf_bytes, page_num + 1)
-                            if camelot_text and camelot_text.strip():
-                                page_text += camelot_text + "\n"
-                                content_found = True
-                                print(f"Page {page_num + 1}: Camelot table content extracted")
-                        except Exception:
-                            pass
-                    
-                    # Step 3: Enhanced OCR with multiple configurations
-                    if OCR_AVAILABLE and (not content_found or len(page_text.strip()) < 50):
-                        try:
-                            # High resolution for better text recognition
-                            page_image = page.to_image(resolution=300)
-                            
-                            # Multiple OCR strategies
-                            ocr_configs = [
-                                '--psm 6 -c tessedit_do_invert=0',  # Uniform text block
-                                '--psm 4 -c tessedit_do_invert=0',  # Single column
-                                '--psm 3 -c tessedit_do_invert=0',  # Fully automatic
-                                '--psm 11 -c tessedit_do_invert=0'  # Sparse text
-                            ]
-                            
-                            best_ocr_text = ""
-                            for config in ocr_configs:
-                                try:
-                                    ocr_text = pytesseract.image_to_string(page_image.original, config=config)
-                                    if len(ocr_text.strip()) > len(best_ocr_text.strip()):
-                                        best_ocr_text = ocr_text
-                                except Exception:
-                                    continue
-                            
-                            if best_ocr_text and best_ocr_text.strip() and len(best_ocr_text.strip()) > 10:
-                                page_text += best_ocr_text + "\n"
-                                content_found = True
-                                print(f"Page {page_num + 1}: OCR content extracted")
-                        except Exception:
-                            pass
-                    
-                    if content_found:
-                        full_text += page_text
-                    else:
-                        print(f"Page {page_num + 1}: No extractable content found")
+            with SuppressOutput():
+                pdf = pdfplumber.open(pdf_file)
+            
+            with pdf:
+                with SuppressOutput():
+                    page_count = min(len(pdf.pages), max_pages) if max_pages else len(pdf.pages)
+                page_texts = self._iter_local_page_texts(pdf, pdf_bytes, page_count)
+                try:
+                    for page_text in page_texts:
+                        if page_text:
+                            pages_yielded += 1
+                            yield page_text
+                finally:
+                    page_texts.close()  # Cancel queued OCR if the caller stopped early
             
-            if full_text.strip():
-                return full_text
+            if pages_yielded:
+                return
                 
         except Exception as e:
-            print(f"Enhanced pdfplumber failed: {e}, trying PyPDF2")
+            if pages_yielded:
+                # Pages already streamed to the caller cannot be re-read from PyPDF2
+                print(f"Enhanced pdfplumber failed after {pages_yielded} pages: {e}")
+                return
+            print(f"Enhanced pdfplumber failed: {e}, trying fallback extraction")
+        
+        yield from islice(self._iter_fallback_page_texts(pdf_bytes), max_pages)
+    
+    def _iter_local_page_texts(self, pdf, pdf_bytes: bytes, page_count: int) -> Iterator[str]:
+        """Extract pages in this process, fanning OCR out to the shared OCR pool.
         
-        # Enhanced PyPDF2 fallback with better text extraction
+        Text and table layers are read here page by page; pages that need OCR
+        are rendered once and recognized concurrently while later pages are
+        read. Pages come out in order with at most a couple of bitmaps per OCR
+        process in flight.
+        """
+        ocr_pool = _get_ocr_pool()
+        render_pdf = _open_render_document(pdf_bytes)
+        pending = deque()  # (page_num, page_text, content_found, OCR future or None)
+        window = 2 * _ocr_workers()
         try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            with SuppressOutput(), warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
+            for page_num, page in enumerate(pdf.pages[:page_count]):
+                if ocr_pool is None:
+                    yield self._extract_page_text(page, page_num, pdf_bytes, render_pdf)
+                    continue
                 
-                # Multiple extraction methods
-                text = page.extract_text()
-                if not text or len(text.strip()) < 10:
-                    # Try alternative extraction
-                    try:
-                        text = ""
-                        if '/Contents' in page:
-                            content = page['/Contents']
-                            if hasattr(content, 'get_data'):
-                                raw_text = content.get_data().decode('utf-8', errors='ignore')
-                                # Basic text extraction from raw content
-                                import re
-                                text_matches = re.findall(r'\((.*?)\)', raw_text)
-                                text = ' '.join(text_matches)
-                    except Exception:
-                        pass
+                with SuppressOutput():
+                    page_text, content_found = self._extract_page_layers(page, page_num, pdf_bytes)
+                future = None
+                if self._needs_ocr(page_text, content_found):
+                    future = self._submit_ocr(ocr_pool, page, page_num, render_pdf, content_found)
+                pending.append((page_num, page_text, content_found, future))
                 
+                # Hand back finished pages right away; wait on OCR only when the window is full
+                while pending and (len(pending) > window or pending[0][3] is None or pending[0][3].done()):
+                    yield self._finish_ocr_page(*pending.popleft())
+            
+            while pending:
+                yield self._finish_ocr_page(*pending.popleft())
+        finally:
+            for *_, future in pending:
+                if future is not None:
+                    future.cancel()  # The caller stopped reading pages
+            _close_render_document(render_pdf)
+    
+    def _submit_ocr(self, ocr_pool: ProcessPoolExecutor, page, page_num: int, render_pdf,
+                    content_found: bool) -> Optional[Future]:
+        """Render a page and queue it for OCR, or None when it could not be rendered."""
+        try:
+            # Grayscale is what Tesseract binarizes anyway, and a third of the bytes to ship
+            image = self._render_page_image(page, page_num, render_pdf, self._ocr_resolution(content_found))
+            image = image.convert("L")
+        except Exception:
+            return None
+        
+        try:
+            return ocr_pool.submit(_ocr_bitmap, image.mode, image.size, image.tobytes())
+        except BrokenProcessPool:
+            # An OCR process died; recognize this page here and let the next upload restart the pool
+            _discard_ocr_pool(ocr_pool)
+            future = Future()
+            future.set_result(self._ocr_image(image))
+            return future
+    
+    def _finish_ocr_page(self, page_num: int, page_text: str, content_found: bool,
+                         future: Optional[Future]) -> str:
+        """Merge a page's OCR result (if any) into its text layer."""
+        if future is not None:
+            try:
+                ocr_text = future.result()
+            except Exception:
+                ocr_text = ""
+            page_text, content_found = self._add_ocr_text(page_text, content_found, ocr_text, page_num)
+        return self._finish_page(page_text, content_found, page_num)
+    
+    def _iter_fallback_page_texts(self, pdf_bytes: bytes) -> Iterator[str]:
+        """Plain text-layer extraction: PDFium when installed, then pdfminer, PyPDF2 as last resort."""
+        extractors = []
+        if PDFIUM_AVAILABLE:
+            extractors.append(("PDFium", self._iter_pdfium_page_texts))
+        extractors.append(("pdfminer", self._iter_pdfminer_page_texts))
+        
+        for name, extractor in extractors:
+            pages_yielded = 0
+            try:
+                for page_text in extractor(pdf_bytes):
+                    pages_yielded += 1
+                    yield page_text
+                if pages_yielded:
+                    return
+            except Exception as e:
+                if pages_yielded:
+                    print(f"{name} extraction failed after {pages_yielded} pages: {e}")
+                    return
+                print(f"{name} extraction failed: {e}, trying next extractor")
+        
+        yield from self._iter_pypdf2_page_texts(pdf_bytes)
+    
+    def _iter_pdfminer_page_texts(self, pdf_bytes: bytes) -> Iterator[str]:
+        """Extract each page's text layer with pdfminer's content-stream parser."""
+        with SuppressOutput():
+            text = pdfminer_extract_text(io.BytesIO(pdf_bytes), laparams=LAParams(line_margin=0.3, char_margin=1.5))
+        
+        # pdfminer separates pages with form feeds
+        for page_num, page_text in enumerate(text.split('\f')):
+            if page_text.strip():
+                yield f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+    
+    def _iter_pdfium_page_texts(self, pdf_bytes: bytes) -> Iterator[str]:
+        """Extract each page's text layer with the native PDFium engine."""
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            for page_num in range(len(pdf)):
+                with _PDFIUM_LOCK:
+                    text = pdf[page_num].get_textpage().get_text_range()
                 if text and text.strip():
-                    full_text += f"\n--- Page {page_num + 1} ---\n{text}\n"
+                    yield f"\n--- Page {page_num + 1} ---\n{text}\n"
+        finally:
+            with _PDFIUM_LOCK:
+                pdf.close()
+    
+    def _extract_page_text(self, page, page_num: int, pdf_bytes: bytes, render_pdf=None) -> str:
+        """Extract text, tables and OCR content from a single pdfplumber page."""
+        with SuppressOutput():
+            page_text, content_found = self._extract_page_layers(page, page_num, pdf_bytes)
+        
+        # Step 3: OCR for pages with little or no text layer
+        if self._needs_ocr(page_text, content_found):
+            try:
+                image = self._render_page_image(page, page_num, render_pdf, self._ocr_resolution(content_found))
+                best_ocr_text = self._ocr_image(image)
+                del image
+                page_text, content_found = self._add_ocr_text(page_text, content_found, best_ocr_text, page_num)
+            except Exception:
+                pass
+        
+        return self._finish_page(page_text, content_found, page_num)
+    
+    def _extract_page_layers(self, page, page_num: int, pdf_bytes: bytes) -> Tuple[str, bool]:
+        """Steps 1-2.5: text layer and tables, returning (page text, content found)."""
+        page_text = f"\n--- Page {page_num + 1} ---\n"
+        content_found = False
+        
+        # Step 1: Enhanced text extraction with multiple methods
+        text = page.extract_text(layout=True, x_tolerance=3, y_tolerance=3)
+        if not text or len(text.strip()) < 10:
+            text = page.extract_text()  # Fallback to basic extraction
+        
+        if text and text.strip() and len(text.strip()) > 5:
+            page_text += text + "\n"
+            content_found = True
+            print(f"Page {page_num + 1}: Text content extracted")
+        
+        # Step 2: Enhanced table extraction with multiple strategies
+        try:
+            tables = []
+            # Narrative pages have no ruling lines or boxes: skip edge clustering entirely
+            if page.lines or page.rects:
+                # Strategy 1: Standard table extraction
+                strict_tables = page.find_tables(table_settings={
+                    "vertical_strategy": "lines_strict",
+                    "horizontal_strategy": "lines_strict",
+                    "snap_tolerance": 3,
+                    "join_tolerance": 3
+                })
+                tables = [table.extract() for table in strict_tables]
+                
+                if not tables and page.find_tables():
+                    # Strategy 2: Text-based table detection, only where a table was detected
+                    tables = page.extract_tables(table_settings={
+                        "vertical_strategy": "text",
+                        "horizontal_strategy": "text"
+                    })
             
-            return full_text if full_text.strip() else "No extractable content found in PDF"
+            if tables:
+                for table in tables:
+                    for row in table:
+                        if row and any(cell for cell in row if cell):
+                            row_text = " | ".join(str(cell or "").strip() for cell in row)
+                            if row_text.strip():
+                                page_text += row_text + "\n"
+                content_found = True
+                print(f"Page {page_num + 1}: Table content extracted")
+        except Exception:
+            pass
+        
+        # Step 2.5: Advanced Camelot table extraction if available
+        if not content_found and CAMELOT_AVAILABLE:
+            try:
+                camelot_text = self.extract_with_camelot_page(pdf_bytes, page_num + 1)
+                if camelot_text and camelot_text.strip():
+                    page_text += camelot_text + "\n"
+                    content_found = True
+                    print(f"Page {page_num + 1}: Camelot table content extracted")
+            except Exception:
+                pass
+        
+        return page_text, content_found
+    
+    @staticmethod
+    def _needs_ocr(page_text: str, content_found: bool) -> bool:
+        """OCR only pages whose text layer came back empty or sparse."""
+        return OCR_AVAILABLE and (not content_found or len(page_text.strip()) < 50)
+    
+    @staticmethod
+    def _ocr_resolution(content_found: bool) -> int:
+        """300 DPI for image-only pages; 200 DPI (2.25x fewer pixels) when OCR only augments a text layer."""
+        return 200 if content_found else 300
+    
+    @staticmethod
+    def _render_page_image(page, page_num: int, render_pdf=None, resolution: int = 300):
+        """Rasterize a page for OCR.
+        
+        PDFium renders straight to a raw bitmap from the already-open render_pdf,
+        skipping pdfplumber's PageImage wrapper; pdfplumber's renderer is the fallback.
+        """
+        if render_pdf is not None:
+            try:
+                with _PDFIUM_LOCK:
+                    # Own copy of the pixels so the image outlives the bitmap
+                    return render_pdf[page_num].render(scale=resolution / 72).to_pil().copy()
+            except Exception:
+                pass
+        
+        # Keep only the rendered bitmap; the PageImage wrapper is dropped right away
+        return page.to_image(resolution=resolution).original
+    
+    @staticmethod
+    def _add_ocr_text(page_text: str, content_found: bool, ocr_text: str, page_num: int) -> Tuple[str, bool]:
+        """Append OCR output to the page when it found real text."""
+        if ocr_text and ocr_text.strip() and len(ocr_text.strip()) > 10:
+            page_text += ocr_text + "\n"
+            content_found = True
+            print(f"Page {page_num + 1}: OCR content extracted")
+        return page_text, content_found
+    
+    @staticmethod
+    def _finish_page(page_text: str, content_found: bool, page_num: int) -> str:
+        """Return the page text, or an empty string when nothing was extracted."""
+        if content_found:
+            return page_text
+        
+        print(f"Page {page_num + 1}: No extractable content found")
+        return ""
+    
+    @staticmethod
+    def _ocr_image(image) -> str:
+        """OCR a rendered page: one uniform-block pass, fully automatic layout only if that finds nothing."""
+        try:
+            ocr_text = _tesseract_text(image, psm=6)
+        except Exception:
+            ocr_text = ""
+        
+        if len(ocr_text.strip()) < 20:
+            try:
+                fallback_text = _tesseract_text(image, psm=3)
+                if len(fallback_text.strip()) > len(ocr_text.strip()):
+                    ocr_text = fallback_text
+            except Exception:
+                pass
+        
+        return ocr_text
+    
+    def _iter_pypdf2_page_texts(self, pdf_bytes: bytes) -> Iterator[str]:
+        """Last-resort PyPDF2 text-layer extraction."""
+        pdf_file = io.BytesIO(pdf_bytes)
+        with SuppressOutput(), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+        
+        for page_num in range(len(pdf_reader.pages)):
+            page = pdf_reader.pages[page_num]
             
-        except Exception as e:
-            return f"Error extracting PDF: {str(e)}"
+            text = page.extract_text()
+            if text and text.strip():
+                yield f"\n--- Page {page_num + 1} ---\n{text}\n"
     
     def extract_lines(self, text: str) -> List[str]:
         """Extract every meaningful line from text."""
-        lines = []
+        return list(self._iter_clean_lines(text))
+    
+    def _iter_clean_lines(self, text: str) -> Iterator[str]:
+        """Yield every meaningful line from text."""
         for line in text.split('\n'):
             line = line.strip()
             # More aggressive line extraction
@@ -190,8 +537,7 @@ class PDFExtractor:
                 line = line.replace('\t', ' ').strip()
                 # Remove page markers but keep other content
                 if line and not line.startswith('--- Page') and not line.startswith('---'):
-                    lines.append(line)
-        return lines
+                    yield line
     
     def extract_with_camelot_page(self, pdf_bytes: bytes, page_num: int) -> str:
         """Extract tables from specific page using Camelot."""
@@ -2,51 +2,55 @@
 
 from typing import List
 import re
+import numpy as np
 
 class TextChunker:
+    WORD_PATTERN = re.compile(r'\S+')
+    SENTENCE_END = re.compile(r'[.!?]$')
+    
     def __init__(self, chunk_size: int = 200, overlap: int = 50):
         self.chunk_size = chunk_size
         self.overlap = overlap
     
     def chunk_text(self, text: str) -> List[str]:
-        """Split text into small overlapping chunks for better retrieval."""
-        # Clean text
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Split by sentences first
-        sentences = re.split(r'[.!?]+', text)
+        """Split text into small overlapping chunks for better retrieval.
         
-        chunks = []
-        current_chunk = ""
+        Words are tokenized once and chunks are found as (start, end) index
+        ranges over a cumulative character-offset array, so the whole pass is
+        O(N); strings are only built when a chunk is emitted.
+        """
+        words = self.WORD_PATTERN.findall(text)
+        if not words:
+            return []
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            # If adding this sentence would exceed chunk size
-            if len(current_chunk + " " + sentence) > self.chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    # Start new chunk with overlap
-                    words = current_chunk.split()
-                    if len(words) > self.overlap:
-                        current_chunk = " ".join(words[-self.overlap:]) + " " + sentence
-                    else:
-                        current_chunk = sentence
-                else:
-                    # Single sentence is too long, split by words
-                    words = sentence.split()
-                    for i in range(0, len(words), self.chunk_size):
-                        chunk_words = words[i:i + self.chunk_size]
-                        chunks.append(" ".join(chunk_words))
-                    current_chunk = ""
-            else:
-                current_chunk = (current_chunk + " " + sentence).strip()
+        # offsets[i] = length of " ".join(words[:i]) + 1; a chunk words[a:b] is offsets[b] - offsets[a] - 1 chars
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum([len(word) + 1 for word in words], out=offsets[1:])
+        # Word indices just after a sentence-ending word
+        boundaries = np.flatnonzero([bool(self.SENTENCE_END.search(word)) for word in words]) + 1
         
-        # Add final chunk
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        chunks = []
+        start = 0
+        prev_end = 0
+        while start < len(words):
+            # Furthest end that keeps the chunk within chunk_size characters;
+            # always past the previous chunk so an overlap never yields a pure suffix of it
+            end = int(np.searchsorted(offsets, offsets[start] + self.chunk_size + 1, side='right')) - 1
+            end = min(max(end, start + 1, prev_end + 1), len(words))
+            
+            if end < len(words):
+                # Prefer to stop at the last sentence boundary inside the window that adds new words
+                idx = int(np.searchsorted(boundaries, end, side='right')) - 1
+                if idx >= 0 and boundaries[idx] > max(start, prev_end):
+                    end = int(boundaries[idx])
+            
+            chunks.append(" ".join(words[start:end]))
+            if end >= len(words):
+                break
+            
+            # Carry the last `overlap` words forward only when the chunk is longer than that
+            prev_end = end
+            start = end - self.overlap if end - start > self.overlap else end
         
         return [chunk for chunk in chunks if len(chunk.strip()) > 20]  # Filter very short chunks
 
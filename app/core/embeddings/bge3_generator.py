@@ -5,16 +5,31 @@ import numpy as np
 from typing import List
 import torch
 import gc
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from app.config.settings import settings
+from app.core.embeddings.onnx_encoder import OnnxInt8Encoder, ONNX_AVAILABLE
 
 class BGE3Generator:
+    # Single embeddings between CUDA cache releases; each release synchronizes the stream
+    CACHE_CLEAR_INTERVAL = 256
+    
     def __init__(self):
-        self.model_name = "BAAI/bge-large-en-v1.5"
+        self.model_name = settings.BGE_MODEL_NAME
         self.model = None
         self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._since_cache_clear = 0
         self._load_model()
         
     def _load_model(self):
         """Load model with optimized settings."""
+        if self._device == "cpu" and settings.EMBEDDING_ONNX_INT8 and ONNX_AVAILABLE:
+            try:
+                self.model = OnnxInt8Encoder(self.model_name, settings.EMBEDDING_ONNX_DIR)
+                return
+            except Exception as e:
+                print(f"ONNX int8 model loading error: {e}, using PyTorch model")
+        
         try:
             self.model = SentenceTransformer(
                 self.model_name,
@@ -25,58 +40,126 @@ class BGE3Generator:
         except Exception as e:
             print(f"Model loading error: {e}")
             self.model = SentenceTransformer(self.model_name)
+        self.model.eval()  # Pinned to its device once; inference only from here on
+        
+    @staticmethod
+    def _to_unit_float32(embeddings: np.ndarray) -> np.ndarray:
+        """Return contiguous float32 rows with unit L2 norm, ready to store as-is."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
         
     def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """Generate embeddings with memory optimization."""
         try:
             if not texts:
                 return np.array([])
-                
-            # Process in smaller batches to avoid memory issues
-            all_embeddings = []
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                embeddings = self.model.encode(
-                    batch, 
-                    normalize_embeddings=True, 
-                    convert_to_numpy=True,
-                    show_progress_bar=False
-                )
-                all_embeddings.append(embeddings)
-                
-                # Clear GPU cache if using CUDA
-                if self._device == "cuda":
-                    torch.cuda.empty_cache()
-                    
-            return np.vstack(all_embeddings) if all_embeddings else np.array([])
+            return self._encode_unique(texts, batch_size)
             
         except Exception as e:
             print(f"Batch embedding generation failed: {e}")
             # Fallback to individual processing
-            return np.array([self.generate_single_embedding(text) for text in texts])
+            return np.array([self.generate_single_embedding(text) for text in texts], dtype=np.float32)
+        
+    def _encode_unique(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode texts, running each distinct string once; raises on failure."""
+        # Identical strings (repeated boilerplate) cost one forward pass
+        unique_texts = list(dict.fromkeys(texts))
+        
+        if not isinstance(self.model, SentenceTransformer):
+            # ONNX encoder: its encode() already length-sorts and batches
+            embeddings = self._to_unit_float32(self.model.encode(unique_texts, batch_size=batch_size))
+        else:
+            embeddings = self._encode_pipelined(unique_texts, batch_size)
+        
+        if len(unique_texts) == len(texts):
+            return embeddings
+        row_of = {text: row for row, text in enumerate(unique_texts)}
+        return embeddings[np.fromiter((row_of[text] for text in texts), dtype=np.intp, count=len(texts))]
+        
+    def _encode_pipelined(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Forward length-sorted batches while a helper thread tokenizes the next one."""
+        # Longest first, as encode() does, so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda idx: -len(texts[idx]))
+        batches = [
+            [texts[idx] for idx in order[start:start + batch_size]]
+            for start in range(0, len(order), batch_size)
+        ]
+        
+        def tokenize(batch: List[str]) -> dict:
+            features = self.model.tokenize(batch)
+            if self._device == "cuda":
+                # Pinned memory lets the host-to-device copy overlap the running forward pass
+                return {name: tensor.pin_memory().to(self._device, non_blocking=True) for name, tensor in features.items()}
+            return features
+        
+        chunks = []
+        if len(batches) == 1:
+            # Nothing to overlap (upload batches usually land here): skip the helper thread
+            with torch.inference_mode():
+                output = self.model(tokenize(batches[0]))
+            chunks.append(output['sentence_embedding'].float().cpu().numpy())
+        else:
+            with ThreadPoolExecutor(max_workers=1) as tokenizer_pool, torch.inference_mode():
+                pending = tokenizer_pool.submit(tokenize, batches[0])
+                for i in range(len(batches)):
+                    features = pending.result()
+                    if i + 1 < len(batches):
+                        pending = tokenizer_pool.submit(tokenize, batches[i + 1])
+                    output = self.model(features)
+                    chunks.append(output['sentence_embedding'].float().cpu().numpy())
+        
+        sorted_embeddings = np.concatenate(chunks)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return self._to_unit_float32(embeddings)
+        
+    def generate_batch_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Encode a chunk of texts for the upload pipeline.
+        
+        Same deduplicated, length-sorted, pipelined path as generate_embeddings,
+        but errors propagate so the caller can skip just this batch.
+        """
+        if not texts:
+            return np.empty((0, self.get_embedding_dimension()), dtype=np.float32)
+        return self._encode_unique(texts, settings.BATCH_SIZE_EMBEDDING)
         
     def generate_single_embedding(self, text: str) -> np.ndarray:
-        """Generate embedding for a single text with error handling."""
+        """Generate embedding for a single text with error handling.
+        
+        Repeat texts are served from an LRU cache; the returned array is read-only.
+        """
         try:
             if not text or not text.strip():
-                return np.zeros(1024)
-                
-            embedding = self.model.encode(
-                [text.strip()], 
-                normalize_embeddings=True, 
-                convert_to_numpy=True,
-                show_progress_bar=False
-            )[0]
+                return np.zeros(1024, dtype=np.float32)
             
-            # Clear cache periodically
-            if self._device == "cuda" and torch.cuda.is_available():
-                torch.cuda.empty_cache()
-                
-            return embedding
+            return self._cached_single_embedding(text.strip())
             
         except Exception as e:
             print(f"Single embedding generation failed: {e}")
-            return np.zeros(1024)  # Return zero vector as fallback
+            return np.zeros(1024, dtype=np.float32)  # Return zero vector as fallback
+    
+    @lru_cache(maxsize=2048)  # ~8MB of float32 1024-d vectors; failures are not cached
+    def _cached_single_embedding(self, text: str) -> np.ndarray:
+        """Encode one stripped text; results are shared, so they are frozen."""
+        embedding = self.model.encode(
+            [text],
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )[0]
+        
+        # Clear cache periodically
+        if self._device == "cuda":
+            self._since_cache_clear += 1
+            if self._since_cache_clear >= self.CACHE_CLEAR_INTERVAL:
+                torch.cuda.empty_cache()
+                self._since_cache_clear = 0
+        
+        embedding = self._to_unit_float32(embedding)
+        embedding.setflags(write=False)
+        return embedding
         
     def get_embedding_dimension(self) -> int:
         """Return embedding dimension (1024 for BGE-large)."""
@@ -0,0 +1,75 @@
+"""Int8-quantized ONNX Runtime encoder for CPU embedding."""
+
+import numpy as np
+from pathlib import Path
+from typing import List, Union
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+class OnnxInt8Encoder:
+    """Drop-in for SentenceTransformer.encode backed by a dynamically quantized ONNX export.
+
+    The export and quantization run once and are cached under cache_dir.
+    BGE models embed with the [CLS] token, so pooling takes the first position.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, max_seq_length: int = 512):
+        export_dir = Path(cache_dir) / model_name.replace('/', '__')
+        quantized_path = export_dir / "model_int8.onnx"
+        if not quantized_path.exists():
+            self._export(model_name, export_dir, quantized_path)
+
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(str(export_dir))
+        self.session = ort.InferenceSession(str(quantized_path), providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    @staticmethod
+    def _export(model_name: str, export_dir: Path, quantized_path: Path) -> None:
+        """Export the Hugging Face model to ONNX and quantize its linear layers to int8."""
+        print(f"Exporting {model_name} to int8 ONNX (one-time)...")
+        ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(str(export_dir))
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(str(export_dir))
+        quantize_dynamic(str(export_dir / "model.onnx"), str(quantized_path), weight_type=QuantType.QInt8)
+
+    def eval(self) -> "OnnxInt8Encoder":
+        """No-op, for parity with the torch model."""
+        return self
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, normalize_embeddings: bool = True,
+               convert_to_numpy: bool = True, show_progress_bar: bool = False) -> np.ndarray:
+        """Embed texts in length-sorted batches, returning rows in input order."""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Longest first, as sentence-transformers does, so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda idx: -len(texts[idx]))
+        chunks = []
+        for start in range(0, len(order), batch_size):
+            batch = [texts[idx] for idx in order[start:start + batch_size]]
+            encoded = self.tokenizer(
+                batch, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+            )
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            last_hidden_state = self.session.run(None, feeds)[0]
+            chunks.append(last_hidden_state[:, 0])  # [CLS] pooling
+
+        sorted_embeddings = np.concatenate(chunks).astype(np.float32, copy=False)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,153 @@
+"""Batched embedding pipeline shared by upload and document processing."""
+
+import asyncio
+import logging
+import threading
+from typing import List, Dict, Any, Iterator, Tuple
+from app.config.settings import settings
+from app.core.embeddings.bge3_generator import bge3_generator
+
+logger = logging.getLogger(__name__)
+
+def line_metadata(filename: str, line_number: int, document_type: str) -> Dict[str, Any]:
+    """Metadata stored alongside every embedded line."""
+    return {
+        'filename': filename,
+        'line_number': line_number,
+        'type': 'document_line',
+        'document_type': document_type
+    }
+
+def collect_lines(lines: List[str], filename: str, document_type: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Collect meaningful lines and their metadata for batched embedding.
+    
+    Repeated lines (headers, footers, boilerplate) are kept only at their first
+    occurrence: the store's unique (content, filename) index would drop the
+    later copies anyway, so embedding them is wasted work.
+    """
+    texts, meta = [], []
+    seen = set()
+    for i, line in enumerate(lines, 1):
+        line = line.strip()
+        if len(line) > 10 and line not in seen:  # Process all meaningful lines
+            seen.add(line)
+            texts.append(line)
+            meta.append(line_metadata(filename, i, document_type))
+    return texts, meta
+
+async def _embed_and_insert(store, texts: List[str], meta: List[Dict[str, Any]], semaphore: asyncio.Semaphore) -> int:
+    """Embed one batch off the event loop and insert it, returning lines stored.
+    
+    Releases the semaphore slot acquired by the dispatcher.
+    """
+    try:
+        try:
+            embeddings = await asyncio.to_thread(bge3_generator.generate_batch_embeddings, texts)
+        except Exception as e:
+            logger.warning("Error on batch starting at line %s: %s", meta[0]['line_number'], e)
+            return 0  # Continue processing other batches
+
+        await store.insert_embeddings([
+            {'content': text, 'embedding': embedding, 'metadata': line_meta}
+            for text, embedding, line_meta in zip(texts, embeddings, meta)
+        ])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Batch stored: %s lines from %s", len(texts), meta[0]['filename'])
+        return len(texts)
+    finally:
+        semaphore.release()
+
+async def _dispatch_batches(store, texts: List[str], meta: List[Dict[str, Any]],
+                            semaphore: asyncio.Semaphore, tasks: List[asyncio.Task]) -> None:
+    """Split texts into length-sorted batches and launch an embed+insert task per batch."""
+    # Sort by length so each batch pads to a similar sequence length;
+    # the index array keeps every embedding paired with its original line
+    order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+    batch_size = settings.BATCH_SIZE_EMBEDDING
+
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        # Waiting for a free slot here keeps in-flight batches (and memory) bounded
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(_embed_and_insert(
+            store,
+            [texts[idx] for idx in chunk],
+            [meta[idx] for idx in chunk],
+            semaphore
+        )))
+
+async def embed_and_store(store, texts: List[str], meta: List[Dict[str, Any]]) -> int:
+    """Embed texts in concurrent batches and store them, returning lines stored."""
+    semaphore = asyncio.Semaphore(settings.UPLOAD_BATCH_CONCURRENCY)
+    tasks: List[asyncio.Task] = []
+    await _dispatch_batches(store, texts, meta, semaphore, tasks)
+    return sum(await asyncio.gather(*tasks))
+
+async def embed_lines_batched(store, lines: List[str], filename: str, document_type: str) -> int:
+    """Embed every meaningful line of a document in batches, returning lines stored."""
+    texts, meta = collect_lines(lines, filename, document_type)
+    return await embed_and_store(store, texts, meta)
+
+async def embed_lines_streamed(store, pages: Iterator[List[str]], filename: str, document_type: str) -> Tuple[int, int]:
+    """Embed lines while they are still being extracted, returning (lines seen, lines stored).
+    
+    A background thread drives the blocking page iterator into a bounded queue,
+    one page of lines per hand-off; batches are embedded and inserted as soon
+    as enough lines have arrived. If the upload is cancelled or fails, the
+    producer is stopped, the page iterator closed and the thread joined.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.UPLOAD_BATCH_CONCURRENCY)
+    end_of_pages = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for page_lines in pages:
+                if stop.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put(page_lines), loop).result()
+        finally:
+            close = getattr(pages, "close", None)
+            if close is not None:
+                close()  # Shuts down the PDF page workers when abandoned early
+            if not stop.is_set():
+                asyncio.run_coroutine_threadsafe(queue.put(end_of_pages), loop).result()
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    semaphore = asyncio.Semaphore(settings.UPLOAD_BATCH_CONCURRENCY)
+    tasks: List[asyncio.Task] = []
+    # Sort lines within a window of a few batches to keep padding low without buffering the file
+    window = settings.UPLOAD_BATCH_CONCURRENCY * settings.BATCH_SIZE_EMBEDDING
+    texts, meta = [], []
+    seen = set()  # Skip repeated lines, as in collect_lines
+    lines_seen = 0
+
+    try:
+        while True:
+            page_lines = await queue.get()
+            if page_lines is end_of_pages:
+                break
+            for line in page_lines:
+                lines_seen += 1
+                line = line.strip()
+                if len(line) > 10 and line not in seen:  # Process all meaningful lines
+                    seen.add(line)
+                    texts.append(line)
+                    meta.append(line_metadata(filename, lines_seen, document_type))
+            if len(texts) >= window:
+                await _dispatch_batches(store, texts, meta, semaphore, tasks)
+                texts, meta = [], []
+
+        await _dispatch_batches(store, texts, meta, semaphore, tasks)
+        lines_stored = sum(await asyncio.gather(*tasks))
+    finally:
+        stop.set()
+        for task in tasks:
+            task.cancel()  # No-op for finished batches
+        # Free queue slots so a put blocked in the producer completes and it sees the stop flag
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.wait({producer})
+    producer.result()  # Re-raise extraction failures
+    return lines_seen, lines_stored
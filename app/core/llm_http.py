@@ -0,0 +1,53 @@
+"""Shared HTTP clients for LLM provider calls."""
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_CLIENT_OPTIONS = dict(
+    http2=HTTP2_AVAILABLE,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+)
+
+_async_client = None
+_sync_client = None
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """App-wide keep-alive client, multiplexed over HTTP/2 when h2 is installed.
+
+    Passed as ``http_async_client`` to every ChatOpenAI/AzureChatOpenAI so all
+    ``ainvoke`` calls reuse the same pooled TLS connections.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(**_CLIENT_OPTIONS)
+    return _async_client
+
+def get_llm_sync_http_client() -> httpx.Client:
+    """Blocking counterpart passed as ``http_client``, used by ``invoke`` in graph nodes."""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_CLIENT_OPTIONS)
+    return _sync_client
+
+def llm_http_kwargs() -> dict:
+    """Keyword arguments that point a LangChain OpenAI client at the shared pools."""
+    return {
+        "http_client": get_llm_sync_http_client(),
+        "http_async_client": get_llm_http_client()
+    }
+
+async def close_llm_http_clients() -> None:
+    """Close the shared clients on shutdown."""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
@@ -0,0 +1,33 @@
+"""Non-blocking application logging."""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from app.config.settings import settings
+
+_listener = None
+
+def configure_logging(level: str = settings.LOG_LEVEL) -> None:
+    """Route the ``app`` logger hierarchy through a queue.
+
+    Records are handed to a background thread that owns the stream handler,
+    so writing to stdout never blocks the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # Own level and no propagation: other modules may lower the root logger's level
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level.upper())
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
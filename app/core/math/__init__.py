@@ -0,0 +1 @@
+"""Vector math kernels."""
\ No newline at end of file
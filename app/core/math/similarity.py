@@ -0,0 +1,68 @@
+"""Cosine similarity kernels for Python-side vector scoring."""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _dot_scores(query: np.ndarray, mat: np.ndarray) -> np.ndarray:
+        """Dot every row of mat with query (cosine for unit-norm vectors)."""
+        n_rows, dim = mat.shape
+        scores = np.empty(n_rows, dtype=np.float32)
+        for i in prange(n_rows):
+            acc = np.float32(0.0)
+            for j in range(dim):
+                acc += mat[i, j] * query[j]
+            scores[i] = acc
+        return scores
+else:
+    def _dot_scores(query: np.ndarray, mat: np.ndarray) -> np.ndarray:
+        """Dot every row of mat with query (cosine for unit-norm vectors)."""
+        return mat @ query
+
+# Rows per upcast block for reduced-precision matrices (~32MB of float32 at 1024-d)
+_BLOCK_ROWS = 8192
+
+def _scores(query: np.ndarray, mat: np.ndarray) -> np.ndarray:
+    """Score all rows, streaming reduced-precision storage through float32 blocks."""
+    if mat.dtype == np.float32:
+        return _dot_scores(query, np.ascontiguousarray(mat))
+    
+    # float16 storage halves the bytes read from memory; each block is upcast
+    # into a cache-sized float32 buffer so the dot product still runs on SGEMV
+    scores = np.empty(mat.shape[0], dtype=np.float32)
+    for start in range(0, mat.shape[0], _BLOCK_ROWS):
+        block = mat[start:start + _BLOCK_ROWS].astype(np.float32)
+        scores[start:start + _BLOCK_ROWS] = block @ query
+    return scores
+
+def cosine_topk(query: np.ndarray, mat: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (indices, scores) of the k rows most similar to query, best first.
+    
+    Both query and mat rows are expected to be L2-normalized at insert time,
+    so cosine similarity reduces to a single dot product.
+    """
+    if k <= 0 or mat.shape[0] == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    # Always a fresh writable array: numba types read-only arrays separately, and cached
+    # query embeddings are frozen, so passing them through would compile a second kernel
+    query = np.array(query, dtype=np.float32, order='C')
+    scores = _scores(query, mat)
+    
+    k = min(k, scores.shape[0])
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+def warmup() -> None:
+    """Compile (or load from the on-disk cache) the scoring kernel ahead of the first query."""
+    dim = 8
+    query = np.ones(dim, dtype=np.float32) / np.sqrt(dim)
+    cosine_topk(query, np.tile(query, (2, 1)), 1)
@@ -4,7 +4,7 @@ import asyncpg
 import json
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from app.config.settings import settings
 from app.models.chat import ChatMessage, ChatSession, FeedbackRequest
 
@@ -12,9 +12,25 @@ class ChatMemoryManager:
     def __init__(self):
         self._pool: Optional[asyncpg.Pool] = None
     
+    @staticmethod
+    async def _init_connection(conn):
+        """Encode/decode JSONB in the driver so rows arrive as dicts.
+        
+        Binary format (version byte + JSON text) so the codec also works for COPY.
+        """
+        await conn.set_type_codec(
+            'jsonb',
+            encoder=lambda value: b'\x01' + json.dumps(value).encode(),
+            decoder=lambda data: json.loads(data[1:]),
+            schema='pg_catalog',
+            format='binary'
+        )
+    
     async def _get_pool(self):
         if self._pool is None:
-            self._pool = await asyncpg.create_pool(settings.DATABASE_URL, min_size=1, max_size=5)
+            self._pool = await asyncpg.create_pool(
+                settings.DATABASE_URL, min_size=1, max_size=5, init=self._init_connection
+            )
         return self._pool
     
     async def create_tables(self):
@@ -66,44 +82,62 @@ class ChatMemoryManager:
         """Add message to session."""
         pool = await self._get_pool()
         async with pool.acquire() as conn:
-            # Ensure session exists
-            await conn.execute(
-                "INSERT INTO chat_sessions (session_id) VALUES ($1) ON CONFLICT DO NOTHING",
-                session_id
-            )
-            
-            message_id = await conn.fetchval(
-                "INSERT INTO chat_messages (session_id, role, content, metadata) VALUES ($1, $2, $3, $4) RETURNING id",
-                session_id, role, content, json.dumps(metadata or {})
-            )
-            
-            # Update session timestamp
-            await conn.execute(
-                "UPDATE chat_sessions SET updated_at = NOW() WHERE session_id = $1",
-                session_id
-            )
-            
-            return message_id
+            # Ensure session exists, bump its timestamp and insert the message in one round-trip
+            return await conn.fetchval("""
+                WITH session AS (
+                    INSERT INTO chat_sessions (session_id) VALUES ($1)
+                    ON CONFLICT (session_id) DO UPDATE SET updated_at = NOW()
+                    RETURNING session_id
+                )
+                INSERT INTO chat_messages (session_id, role, content, metadata)
+                SELECT session.session_id, $2, $3, $4 FROM session
+                RETURNING id
+            """, session_id, role, content, metadata or {})
+    
+    async def add_messages(self, session_id: str, messages: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> None:
+        """Bulk-add (role, content, metadata) messages to a session with a single COPY."""
+        if not messages:
+            return
+        
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "INSERT INTO chat_sessions (session_id) VALUES ($1) ON CONFLICT (session_id) DO UPDATE SET updated_at = NOW()",
+                    session_id
+                )
+                await conn.copy_records_to_table(
+                    'chat_messages',
+                    records=[(session_id, role, content, metadata or {}) for role, content, metadata in messages],
+                    columns=['session_id', 'role', 'content', 'metadata']
+                )
     
     async def get_session_context(self, session_id: str, limit: int = 10) -> List[ChatMessage]:
         """Get recent messages for context."""
         pool = await self._get_pool()
         async with pool.acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT role, content, timestamp, metadata FROM chat_messages WHERE session_id = $1 ORDER BY timestamp DESC LIMIT $2",
-                session_id, limit
-            )
+            # Latest `limit` messages, returned in chronological order
+            rows = await conn.fetch("""
+                SELECT role, content, timestamp, metadata
+                FROM (
+                    SELECT id, role, content, timestamp, metadata
+                    FROM chat_messages
+                    WHERE session_id = $1
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT $2
+                ) recent
+                ORDER BY timestamp ASC, id ASC
+            """, session_id, limit)
             
-            messages = []
-            for row in reversed(rows):  # Reverse to get chronological order
-                messages.append(ChatMessage(
+            return [
+                ChatMessage(
                     role=row['role'],
                     content=row['content'],
                     timestamp=row['timestamp'],
-                    metadata=json.loads(row['metadata']) if row['metadata'] else {}
-                ))
-            
-            return messages
+                    metadata=row['metadata'] or {}
+                )
+                for row in rows
+            ]
     
     async def add_feedback(self, feedback: FeedbackRequest) -> None:
         """Store user feedback."""
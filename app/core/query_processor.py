@@ -1,10 +1,24 @@
 """Advanced query preprocessing for better search quality."""
 
 import re
+from functools import lru_cache
+from itertools import islice
 from typing import List, Dict, Any
 from app.config.settings import settings
 
+try:
+    from flashtext import KeywordProcessor
+    FLASHTEXT_AVAILABLE = True
+except ImportError:
+    FLASHTEXT_AVAILABLE = False
+
+# flashtext's default word characters; the regex fallback uses the same term boundaries
+_WORD_CHARS = 'A-Za-z0-9_'
+
 class QueryProcessor:
+    STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'})
+    WORD_PATTERN = re.compile(r'\b\w+\b')
+    
     def __init__(self):
         self.legal_abbreviations = {
             'sec': 'section',
@@ -24,27 +38,8 @@ class QueryProcessor:
             'provision': ['clause', 'section', 'rule'],
             'regulation': ['rule', 'guideline', 'directive']
         }
-    
-    def preprocess_query(self, query: str) -> str:
-        """Enhanced query preprocessing."""
-        # Clean and normalize
-        query = query.strip().lower()
         
-        # Expand abbreviations
-        for abbr, full in self.legal_abbreviations.items():
-            query = re.sub(rf'\b{re.escape(abbr)}\b', full, query, flags=re.IGNORECASE)
-        
-        # Fix common typos
-        query = self._fix_common_typos(query)
-        
-        # Add synonyms for key terms
-        query = self._add_synonyms(query)
-        
-        return query
-    
-    def _fix_common_typos(self, query: str) -> str:
-        """Fix common spelling mistakes."""
-        typo_fixes = {
+        self.typo_fixes = {
             'recieve': 'receive',
             'seperate': 'separate',
             'occured': 'occurred',
@@ -53,11 +48,48 @@ class QueryProcessor:
             'committe': 'committee'
         }
         
-        for typo, correct in typo_fixes.items():
-            query = re.sub(rf'\b{typo}\b', correct, query, flags=re.IGNORECASE)
+        # One replacement table for both paths: abbreviations and typos are
+        # replaced in a single left-to-right pass, longest term first, and only
+        # where the term is not glued to other word characters
+        self._replacements = {**self.legal_abbreviations, **self.typo_fixes}
+        
+        # Regex fallback, compiled once: the longest alternative wins, as in flashtext's trie
+        alternation = '|'.join(re.escape(term) for term in sorted(self._replacements, key=len, reverse=True))
+        self._replacement_pattern = re.compile(
+            rf'(?<![{_WORD_CHARS}])(?:{alternation})(?![{_WORD_CHARS}])', re.IGNORECASE
+        )
+        
+        # Trie-based replacement when flashtext is installed
+        self._keyword_processor = None
+        if FLASHTEXT_AVAILABLE:
+            self._keyword_processor = KeywordProcessor(case_sensitive=False)
+            for term, replacement in self._replacements.items():
+                self._keyword_processor.add_keyword(term, replacement)
+    
+    @lru_cache(maxsize=4096)
+    def preprocess_query(self, query: str) -> str:
+        """Enhanced query preprocessing, memoized per query string."""
+        # Clean and normalize
+        query = query.strip().lower()
+        
+        # Expand abbreviations and fix common typos in one scan
+        query = self._replace_terms(query)
+        
+        # Add synonyms for key terms
+        query = self._add_synonyms(query)
         
         return query
     
+    def _replace_terms(self, query: str) -> str:
+        """Expand abbreviations and fix typos, with flashtext when installed."""
+        if self._keyword_processor is not None:
+            return self._keyword_processor.replace_keywords(query)
+        return self._replace_terms_regex(query)
+    
+    def _replace_terms_regex(self, query: str) -> str:
+        """Regex fallback for _replace_terms with the same table and boundaries."""
+        return self._replacement_pattern.sub(lambda match: self._replacements[match.group().lower()], query)
+    
     def _add_synonyms(self, query: str) -> str:
         """Add relevant synonyms to expand search."""
         words = query.split()
@@ -73,12 +105,8 @@ class QueryProcessor:
     
     def extract_key_terms(self, query: str) -> List[str]:
         """Extract key terms for enhanced search."""
-        # Remove stop words and extract meaningful terms
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'}
-        
-        words = re.findall(r'\b\w+\b', query.lower())
-        key_terms = [word for word in words if word not in stop_words and len(word) > 2]
-        
-        return key_terms[:10]  # Limit to top 10 terms
+        # Remove stop words and extract meaningful terms, stopping at the top 10
+        words = (match.group() for match in self.WORD_PATTERN.finditer(query.lower()))
+        return list(islice((word for word in words if word not in self.STOP_WORDS and len(word) > 2), 10))
 
 query_processor = QueryProcessor()
\ No newline at end of file
@@ -2,6 +2,16 @@
 
 from typing import List, Dict, Any
 import re
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keyword categories scored by _keyword_counts
+_LEGAL, _IMPORTANCE, _QUERY_TERM = 0, 1, 2
 
 class ResultRanker:
     def __init__(self):
@@ -14,44 +24,78 @@ class ResultRanker:
             return results
         
         query_terms = set(query.lower().split())
+        scores = self._relevance_scores(results, query_terms)
+        for result, score in zip(results, scores):
+            result['relevance_score'] = float(score)
         
-        for result in results:
-            score = self._calculate_relevance_score(result, query_terms)
-            result['relevance_score'] = score
-        
-        # Sort by combined score (similarity + relevance)
-        return sorted(results, key=lambda x: (x.get('similarity', 0) * 0.7 + x.get('relevance_score', 0) * 0.3), reverse=True)
+        # Sort by combined score (similarity + relevance); stable, like sorted()
+        similarities = np.array([r.get('similarity', 0) for r in results], dtype=np.float64)
+        combined = similarities * 0.7 + scores * 0.3
+        return [results[i] for i in np.argsort(-combined, kind='stable')]
     
-    def _calculate_relevance_score(self, result: Dict[str, Any], query_terms: set) -> float:
-        """Calculate relevance score based on content analysis."""
-        content = result.get('content', '').lower()
-        metadata = result.get('metadata', {})
-        
-        score = 0.0
-        
-        # Legal keyword bonus
-        legal_matches = sum(1 for keyword in self.legal_keywords if keyword in content)
-        score += legal_matches * 0.1
+    def _relevance_scores(self, results: List[Dict[str, Any]], query_terms: set) -> np.ndarray:
+        """Calculate relevance scores for all results based on content analysis."""
+        counts = self._keyword_counts([self._content_lower(r) for r in results], query_terms)
         
-        # Importance keyword bonus
-        importance_matches = sum(1 for keyword in self.importance_keywords if keyword in content)
-        score += importance_matches * 0.05
+        # Legal keyword bonus, importance keyword bonus, query term frequency
+        weights = np.array([0.1, 0.05, 0.3 / len(query_terms) if query_terms else 0.0])
+        scores = counts @ weights
         
-        # Query term frequency
-        term_matches = sum(1 for term in query_terms if term in content)
-        score += (term_matches / len(query_terms)) * 0.3 if query_terms else 0
+        metadatas = [r.get('metadata', {}) for r in results]
         
         # Document type bonus
-        doc_type = metadata.get('document_type', '')
-        if doc_type == 'pdf':
-            score += 0.1
+        scores += 0.1 * np.array([m.get('document_type', '') == 'pdf' for m in metadatas])
         
         # Line number penalty (prefer earlier content)
-        line_num = metadata.get('line_number', 1)
-        if line_num > 100:
-            score -= 0.05
+        scores -= 0.05 * (np.array([m.get('line_number', 1) for m in metadatas]) > 100)
+        
+        return np.minimum(scores, 1.0)  # Cap at 1.0
+    
+    @staticmethod
+    def _content_lower(result: Dict[str, Any]) -> str:
+        """Lowercased content, computed on first touch and kept on the result for later ranking passes."""
+        content = result.get('_content_lower')
+        if content is None:
+            content = result['_content_lower'] = result.get('content', '').lower()
+        return content
+    
+    def _keyword_counts(self, contents: List[str], query_terms: set) -> np.ndarray:
+        """Count the distinct legal, importance and query keywords contained in each content.
+        
+        Returns a (len(contents), 3) array. With pyahocorasick every content is
+        scanned once for all keywords; otherwise each keyword is a substring test.
+        """
+        keywords = (
+            [(keyword, _LEGAL) for keyword in self.legal_keywords]
+            + [(keyword, _IMPORTANCE) for keyword in self.importance_keywords]
+            + [(term, _QUERY_TERM) for term in query_terms]
+        )
+        categories = np.array([category for _, category in keywords], dtype=np.int64)
+        counts = np.zeros((len(contents), 3), dtype=np.float64)
+        
+        if AHOCORASICK_AVAILABLE:
+            # A word can sit in several categories (e.g. a query term that is also a legal keyword)
+            automaton = ahocorasick.Automaton()
+            ids_by_keyword: Dict[str, List[int]] = {}
+            for keyword_id, (keyword, _) in enumerate(keywords):
+                ids_by_keyword.setdefault(keyword, []).append(keyword_id)
+            for keyword, ids in ids_by_keyword.items():
+                automaton.add_word(keyword, ids)
+            automaton.make_automaton()
+            
+            for row, content in enumerate(contents):
+                matched = set()
+                for _, ids in automaton.iter(content):
+                    matched.update(ids)
+                if matched:
+                    counts[row] = np.bincount(categories[list(matched)], minlength=3)
+        else:
+            for row, content in enumerate(contents):
+                matched = [keyword_id for keyword_id, (keyword, _) in enumerate(keywords) if keyword in content]
+                if matched:
+                    counts[row] = np.bincount(categories[matched], minlength=3)
         
-        return min(score, 1.0)  # Cap at 1.0
+        return counts
     
     def filter_by_quality(self, results: List[Dict[str, Any]], min_similarity: float = 0.3) -> List[Dict[str, Any]]:
         """Filter results by quality thresholds."""
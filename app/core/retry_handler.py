@@ -2,26 +2,37 @@
 
 import asyncio
 import functools
-from typing import Callable, Any, Optional
+import logging
+import random
+from typing import Callable, Any
 
-def retry_async(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
-    """Decorator for async functions with retry logic."""
+logger = logging.getLogger(__name__)
+
+def retry_async(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0, max_delay: float = 30.0):
+    """Decorator for async functions with retry logic.
+    
+    The first attempt runs without any retry bookkeeping; the backoff loop is
+    only entered after a failure. Waits are jittered so concurrent callers
+    hitting the same pool don't retry in lockstep.
+    """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            last_exception: Optional[Exception] = None
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if max_retries <= 1:
+                    raise
+                last_exception = e
             
-            for attempt in range(max_retries):
+            for attempt in range(1, max_retries):
+                wait_time = min(max_delay, delay * (backoff ** (attempt - 1))) * (0.5 + random.random() * 0.5)
+                logger.warning("Attempt %d failed: %s. Retrying in %.2fs...", attempt, last_exception, wait_time)
+                await asyncio.sleep(wait_time)
                 try:
                     return await func(*args, **kwargs)
                 except Exception as e:
                     last_exception = e
-                    if attempt == max_retries - 1:
-                        break
-                    
-                    wait_time = delay * (backoff ** attempt)
-                    print(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
             
             raise last_exception
         return wrapper
@@ -11,6 +11,7 @@ async def initialize_vector_stores():
     for attempt in range(max_retries):
         try:
             await store_manager.initialize_all_stores()
+            await store_manager.warm_up_stores()
             print("✓ All vector stores initialized successfully")
             
             # Initialize chat memory tables
@@ -29,11 +30,16 @@ async def initialize_vector_stores():
                 print("Run 'python scripts/setup_database.py' to set up the database")
                 return False
 
-def startup_handler():
-    """Handle application startup tasks with better error handling."""
+async def warm_up_models() -> bool:
+    """Load the embedding model and compile similarity kernels before the first request."""
     try:
-        # Initialize vector stores in background
-        asyncio.create_task(initialize_vector_stores())
-        print("✓ Startup tasks initiated")
+        from app.core.embeddings.bge3_generator import bge3_generator
+        from app.core.math import similarity
+        
+        await asyncio.to_thread(bge3_generator.generate_batch_embeddings, ["warmup"])
+        await asyncio.to_thread(similarity.warmup)
+        print("✓ Embedding model warmed up")
+        return True
     except Exception as e:
-        print(f"Startup handler error: {e}")
\ No newline at end of file
+        print(f"Model warmup failed: {e}")
+        return False
@@ -0,0 +1,133 @@
+"""In-memory embedding cache for brute-force search without a DB round-trip."""
+
+import json
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from app.config.settings import settings
+from app.core.math.similarity import cosine_topk
+
+class EmbeddingCache:
+    """Contiguous matrix of unit-norm embeddings plus parallel row data."""
+
+    def __init__(self, dimension: int = settings.EMBEDDING_DIMENSION, dtype: str = settings.RAG_CACHE_DTYPE):
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.empty((0, dimension), dtype=self.dtype)
+        self._size = 0
+        self.ids: List[Optional[int]] = []
+        self.contents: List[str] = []
+        self.metas: List[Dict[str, Any]] = []
+        self._keys = set()  # (content, filename) pairs, mirrors the unique index
+        self._line_index: Dict[str, Dict[int, int]] = {}  # filename -> line_number -> row
+        self.loaded = False
+
+    @property
+    def mat(self) -> np.ndarray:
+        """View of the populated rows."""
+        return self._buffer[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int) -> None:
+        """Grow the backing buffer geometrically so appends stay amortized O(1)."""
+        needed = self._size + extra
+        if needed <= self._buffer.shape[0]:
+            return
+        capacity = max(needed, 2 * self._buffer.shape[0], 1024)
+        grown = np.empty((capacity, self.dimension), dtype=self.dtype)
+        grown[:self._size] = self._buffer[:self._size]
+        self._buffer = grown
+
+    def add(self, rows: List[Tuple[Optional[int], str, Any, Dict[str, Any]]]) -> None:
+        """Append (id, content, embedding, metadata) rows, skipping duplicates."""
+        fresh = []
+        for row_id, content, embedding, metadata in rows:
+            key = (content, metadata.get('filename'))
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            fresh.append((row_id, content, embedding, metadata))
+
+        if not fresh:
+            return
+
+        self._reserve(len(fresh))
+        for row_id, content, embedding, metadata in fresh:
+            row = self._size
+            self._buffer[row] = np.asarray(embedding, dtype=self.dtype)
+            self.ids.append(row_id)
+            self.contents.append(content)
+            self.metas.append(metadata)
+
+            filename = metadata.get('filename')
+            line_number = metadata.get('line_number')
+            if filename and line_number:
+                self._line_index.setdefault(filename, {})[int(line_number)] = row
+            self._size += 1
+
+    async def load(self, conn, table_name: str) -> None:
+        """Populate the cache from every row of the store table.
+        
+        Embeddings arrive as float32 ndarrays through the pool's binary pgvector codec.
+        """
+        rows = await conn.fetch(f"""
+            SELECT id, content, embedding, metadata
+            FROM {table_name}
+            ORDER BY id
+        """)
+        self.add([
+            (
+                row['id'],
+                row['content'],
+                row['embedding'],
+                json.loads(row['metadata']) if isinstance(row['metadata'], str) else (row['metadata'] or {})
+            )
+            for row in rows
+        ])
+        self.loaded = True
+        print(f"Embedding cache loaded: {self._size} vectors from {table_name}")
+
+    def search(self, query_vector: np.ndarray, top_k: int = 10, offset: int = 0,
+               min_similarity: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Score all cached vectors against the query and return store-shaped results."""
+        indices, scores = cosine_topk(query_vector, self.mat, top_k + offset)
+        indices, scores = indices[offset:], scores[offset:]
+        if min_similarity is not None:
+            # Scores are best-first, so the passing rows form a prefix
+            keep = int(np.count_nonzero(scores > min_similarity))
+            indices, scores = indices[:keep], scores[:keep]
+
+        results = []
+        for row, score in zip(indices, scores):
+            results.append({
+                'content': self._context_window(int(row)),
+                'original_content': self.contents[row],
+                'similarity': float(score),
+                'metadata': self.metas[row],
+                'id': self.ids[row]
+            })
+        return results
+
+    def _context_window(self, row: int) -> str:
+        """Join surrounding lines of the same document, as the DB context query does."""
+        metadata = self.metas[row]
+        filename = metadata.get('filename', '')
+        line_number = metadata.get('line_number', 0)
+
+        if not filename or not line_number:
+            return self.contents[row]
+
+        lines = self._line_index.get(filename, {})
+        window_size = settings.CONTEXT_WINDOW_SIZE
+        context_lines = [
+            self.contents[lines[ln]]
+            for ln in range(int(line_number) - window_size, int(line_number) + window_size + 1)
+            if ln in lines
+        ]
+
+        full_context = ' '.join(context_lines)
+        if len(full_context) > settings.MAX_CONTEXT_LENGTH:
+            full_context = full_context[:settings.MAX_CONTEXT_LENGTH] + '...'
+
+        return full_context or self.contents[row]
@@ -4,36 +4,198 @@ import asyncpg
 import numpy as np
 import json
 import asyncio
+from contextlib import nullcontext
 from typing import List, Dict, Any, Optional, Tuple, Union
+from cachetools import TTLCache
+from pgvector.asyncpg import register_vector
 from app.config.settings import settings
+from app.core.vector_store.embedding_cache import EmbeddingCache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dump_json(value: Any) -> bytes:
+    """Serialize metadata to UTF-8 JSON bytes."""
+    return orjson.dumps(value) if ORJSON_AVAILABLE else json.dumps(value).encode()
+
+def _load_json(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+_EMPTY_JSON = b'{}'
+
+# pgvector rejects hnsw.ef_search values above this
+HNSW_MAX_EF_SEARCH = 1000
+
+def _ef_search_for(rows: int) -> int:
+    """ef_search that lets an HNSW scan return ``rows`` rows, within pgvector's limit."""
+    return min(max(int(rows), settings.HNSW_EF_SEARCH), HNSW_MAX_EF_SEARCH)
+
+_shared_pool: Optional[asyncpg.Pool] = None
+_shared_pool_lock = asyncio.Lock()
+
+async def _init_connection(conn) -> None:
+    """Register pgvector's binary codec so vectors travel as raw float32.
+    
+    JSONB also uses the binary format (version byte + JSON), accepting
+    pre-encoded bytes so COPY records skip a second serialization.
+    """
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    await register_vector(conn)
+    await conn.set_type_codec(
+        'jsonb',
+        encoder=lambda value: b'\x01' + (value if isinstance(value, bytes) else _dump_json(value)),
+        decoder=lambda data: _load_json(data[1:]),
+        schema='pg_catalog',
+        format='binary'
+    )
+
+async def get_shared_pool() -> asyncpg.Pool:
+    """Connection pool shared by every vector store, created on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        async with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = await asyncpg.create_pool(
+                    settings.DATABASE_URL,
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    command_timeout=settings.DB_COMMAND_TIMEOUT,
+                    max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+                    init=_init_connection,
+                    # Startup parameters survive the RESET ALL run when a connection is released
+                    server_settings={'hnsw.ef_search': str(settings.HNSW_EF_SEARCH)}
+                )
+    return _shared_pool
+
+async def close_shared_pool() -> None:
+    """Close the shared connection pool gracefully."""
+    global _shared_pool
+    if _shared_pool is not None:
+        try:
+            await _shared_pool.close()
+        except (asyncio.CancelledError, Exception):
+            pass
+        finally:
+            _shared_pool = None
 
 class PostgreSQLVectorStore:
+    # Keys written by the embedding pipeline's line metadata, projected as columns on search
+    METADATA_KEYS = ('filename', 'line_number', 'type', 'document_type')
+    
+    # (store_name, filename) -> exists; inserts flip entries to True
+    _exists_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+    
     def __init__(self, store_name: str):
         self.store_name = store_name
         self.table_name = f"embeddings_{store_name}"
         self.index_name = f"hnsw_idx_{store_name}"
-        self._pool: Optional[asyncpg.Pool] = None
+        self.staging_table_name = f"staging_{store_name}"
+        self._cache: Optional[EmbeddingCache] = EmbeddingCache() if settings.RAG_CACHE_ENABLED else None
+        self._cache_lock = asyncio.Lock()
+        self._build_queries()
         
-    async def _get_pool(self):
-        """Get connection pool for better performance."""
-        if self._pool is None:
-            self._pool = await asyncpg.create_pool(
-                settings.DATABASE_URL,
-                min_size=2,
-                max_size=10,
-                command_timeout=60
+    def _build_queries(self) -> None:
+        """Format the hot-path SQL once per store.
+        
+        asyncpg keeps a per-connection cache of prepared statements keyed by query
+        text, so reusing the exact same string skips parse and plan on every call.
+        
+        With HNSW_HALFVEC the index is built over ``embedding::halfvec``; the ANN
+        scan orders by that expression and the candidates are reranked against
+        the full-precision column.
+        """
+        dim = settings.EMBEDDING_DIMENSION
+        self._ann_order = (
+            f"embedding::halfvec({dim}) <#> $1::vector::halfvec({dim})"
+            if settings.HNSW_HALFVEC else "embedding <#> $1::vector"
+        )
+        
+        self._search_sql = f"""
+            WITH candidates AS (
+                SELECT id, content, embedding, metadata
+                FROM {self.table_name}
+                ORDER BY {self._ann_order}
+                LIMIT $6
+            ),
+            hits AS (
+                SELECT id, content, embedding <#> $1::vector AS distance,
+                       metadata->>'filename' AS filename,
+                       NULLIF(metadata->>'line_number', '')::int AS line_number,
+                       metadata->>'type' AS type,
+                       metadata->>'document_type' AS document_type
+                FROM candidates
+                WHERE (embedding <#> $1::vector) < $4
+                ORDER BY embedding <#> $1::vector
+                LIMIT $2 OFFSET $3
+            ),
+            windows AS (
+                -- A window starts a new island unless it overlaps the previous one in its file
+                SELECT filename, line_number,
+                       CASE WHEN line_number - $5 <= LAG(line_number + $5) OVER file_lines + 1
+                            THEN 0 ELSE 1 END AS starts_island
+                FROM hits
+                WHERE filename <> '' AND line_number <> 0
+                WINDOW file_lines AS (PARTITION BY filename ORDER BY line_number)
+            ),
+            ranges AS (
+                SELECT filename, MIN(line_number) - $5 AS first_line, MAX(line_number) + $5 AS last_line
+                FROM (
+                    SELECT filename, line_number,
+                           SUM(starts_island) OVER (PARTITION BY filename ORDER BY line_number) AS island
+                    FROM windows
+                ) islands
+                GROUP BY filename, island
+            ),
+            neighbours AS MATERIALIZED (
+                -- One index range scan per merged range; overlapping lines are read once
+                SELECT r.filename, NULLIF(t.metadata->>'line_number', '')::int AS line_number, t.content
+                FROM ranges r
+                JOIN {self.table_name} t
+                  ON t.metadata->>'filename' = r.filename
+                 AND NULLIF(t.metadata->>'line_number', '')::int BETWEEN r.first_line AND r.last_line
             )
-        return self._pool
+            SELECT h.*, h.distance * -1 AS similarity, ctx.context
+            FROM hits h
+            LEFT JOIN LATERAL (
+                SELECT string_agg(n.content, ' ' ORDER BY n.line_number) AS context
+                FROM neighbours n
+                WHERE n.filename = h.filename
+                AND n.line_number BETWEEN h.line_number - $5 AND h.line_number + $5
+            ) ctx ON h.filename <> '' AND h.line_number <> 0
+            ORDER BY h.distance
+        """
+        self._exists_sql = f"""
+            SELECT 1 FROM {self.table_name} 
+            WHERE metadata->>'filename' = $1
+            LIMIT 1
+        """
+        self._count_sql = f"""
+            SELECT COUNT(*) FROM (
+                SELECT embedding <#> $1::vector AS distance
+                FROM {self.table_name}
+                ORDER BY {self._ann_order}
+                LIMIT $3
+            ) nearest
+            WHERE nearest.distance * -1 > $2
+        """
         
-    async def _get_connection(self):
-        """Get database connection from pool."""
-        pool = await self._get_pool()
-        return await pool.acquire()
+    @staticmethod
+    def _candidate_count(top_k: int, offset: int = 0) -> int:
+        """Rows the ANN scan must return to fill a page after reranking."""
+        return (top_k + offset) * (settings.HNSW_RERANK_FACTOR if settings.HNSW_HALFVEC else 1)
+        
+    async def _get_pool(self):
+        """Get the connection pool shared across stores."""
+        return await get_shared_pool()
         
     async def create_store(self) -> None:
         """Create vector store table and HNSW index."""
-        conn = await self._get_connection()
-        try:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
             await conn.execute(f"""
                 CREATE EXTENSION IF NOT EXISTS vector;
                 CREATE TABLE IF NOT EXISTS {self.table_name} (
@@ -43,10 +205,8 @@ class PostgreSQLVectorStore:
                     metadata JSONB DEFAULT '{{}}'
                 )
             """)
-            await self.create_hnsw_index()
-            print(f"Vector store ready: {self.table_name}")
-        finally:
-            await conn.close()
+        await self.create_hnsw_index()
+        print(f"Vector store ready: {self.table_name}")
         
     async def create_hnsw_index(self) -> None:
         """Create optimized HNSW index for vector similarity search."""
@@ -54,12 +214,21 @@ class PostgreSQLVectorStore:
         async with pool.acquire() as conn:
             try:
                 # Create HNSW index with optimized parameters
-                await conn.execute(f"""
-                    CREATE INDEX IF NOT EXISTS {self.index_name} 
-                    ON {self.table_name} 
-                    USING hnsw (embedding vector_ip_ops) 
-                    WITH (m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION})
-                """)
+                if settings.HNSW_HALFVEC:
+                    # Half-precision graph: half the index memory and bandwidth per traversal
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.index_name}_halfvec 
+                        ON {self.table_name} 
+                        USING hnsw ((embedding::halfvec({settings.EMBEDDING_DIMENSION})) halfvec_ip_ops) 
+                        WITH (m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION})
+                    """)
+                else:
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.index_name} 
+                        ON {self.table_name} 
+                        USING hnsw (embedding vector_ip_ops) 
+                        WITH (m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION})
+                    """)
                 
                 # Create additional indexes for metadata queries
                 await conn.execute(f"""
@@ -67,16 +236,23 @@ class PostgreSQLVectorStore:
                     ON {self.table_name} USING BTREE ((metadata->>'filename'))
                 """)
                 
+                # Context window lookups: equality on filename, range on line number
+                await conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.store_name}_file_line 
+                    ON {self.table_name} ((metadata->>'filename'), (NULLIF(metadata->>'line_number', '')::int))
+                """)
+                
                 await conn.execute(f"""
                     CREATE INDEX IF NOT EXISTS idx_{self.store_name}_content_text 
                     ON {self.table_name} USING GIN (to_tsvector('english', content))
                 """)
                 
-                # Create unique constraint for duplicate prevention (handle existing duplicates)
+                # Create unique constraint for duplicate prevention (handle existing duplicates).
+                # Filename leads so document lookups can use the index prefix
                 try:
                     await conn.execute(f"""
-                        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.store_name}_unique_content 
-                        ON {self.table_name} (content, (metadata->>'filename'))
+                        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.store_name}_unique_file_content 
+                        ON {self.table_name} ((metadata->>'filename'), content)
                     """)
                 except Exception as unique_error:
                     print(f"Unique index creation failed (duplicates exist): {unique_error}")
@@ -88,25 +264,57 @@ class PostgreSQLVectorStore:
                         AND a.metadata->>'filename' = b.metadata->>'filename'
                     """)
                     await conn.execute(f"""
-                        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.store_name}_unique_content 
-                        ON {self.table_name} (content, (metadata->>'filename'))
+                        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.store_name}_unique_file_content 
+                        ON {self.table_name} ((metadata->>'filename'), content)
                     """)
                     print(f"Cleaned duplicates and created unique index")
                 
+                # Superseded by the filename-first unique index above
+                await conn.execute(f"DROP INDEX IF EXISTS idx_{self.store_name}_unique_content")
+                
             except Exception as e:
                 print(f"Index creation failed: {e}")
                 pass
         
+    async def warm_up(self) -> None:
+        """Prime every idle pooled connection and the HNSW index before the first query.
+        
+        Running the real search statement prepares it on each connection and
+        pulls the index's entry layers into Postgres shared buffers. When the
+        in-memory embedding cache is enabled it is loaded here too, so the
+        first search doesn't pay for the full table read.
+        """
+        if await self._ensure_cache():
+            return
+        
+        pool = await self._get_pool()
+        probe = np.full(settings.EMBEDDING_DIMENSION, settings.EMBEDDING_DIMENSION ** -0.5, dtype=np.float32)
+        
+        async def prime():
+            async with pool.acquire() as conn:
+                await conn.fetch(
+                    self._search_sql, probe, 1, 0, float('inf'), settings.CONTEXT_WINDOW_SIZE,
+                    self._candidate_count(1)
+                )
+        
+        try:
+            await asyncio.gather(*(prime() for _ in range(settings.DB_POOL_MIN_SIZE)))
+        except Exception as e:
+            print(f"Store warmup failed: {e}")
+        
     async def check_document_exists(self, filename: str) -> bool:
         """Check if document already exists in store."""
+        key = (self.store_name, filename)
+        exists = self._exists_cache.get(key)
+        if exists is not None:
+            return exists
+        
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             try:
-                count = await conn.fetchval(f"""
-                    SELECT COUNT(*) FROM {self.table_name} 
-                    WHERE metadata->>'filename' = $1
-                """, filename)
-                return count > 0
+                exists = await conn.fetchval(self._exists_sql, filename) is not None
+                self._exists_cache[key] = exists
+                return exists
             except Exception:
                 return False
     
@@ -115,29 +323,61 @@ class PostgreSQLVectorStore:
         if not embeddings:
             return
             
+        # Drop in-batch duplicates of the unique key so they never cross the wire
+        seen = set()
+        unique_embeddings = []
+        for emb in embeddings:
+            key = (emb['content'], emb.get('metadata', {}).get('filename'))
+            if key not in seen:
+                seen.add(key)
+                unique_embeddings.append(emb)
+        embeddings = unique_embeddings
+        
+        # Build the binary COPY records before taking a connection from the pool
+        records = [
+            (
+                emb['content'],
+                np.asarray(emb['embedding'], dtype=np.float32),
+                _dump_json(emb['metadata']) if emb.get('metadata') else _EMPTY_JSON
+            )
+            for emb in embeddings
+        ]
+        
         pool = await self._get_pool()
         conn = None
         try:
             conn = await pool.acquire()
             async with conn.transaction():
-                # Prepare batch data
-                batch_data = []
-                for emb in embeddings:
-                    embedding_vector = emb['embedding']
-                    if isinstance(embedding_vector, np.ndarray):
-                        vector_str = '[' + ','.join(map(str, embedding_vector.tolist())) + ']'
-                    else:
-                        vector_str = '[' + ','.join(map(str, embedding_vector)) + ']'
-                    
-                    metadata_json = json.dumps(emb.get('metadata', {}))
-                    batch_data.append((emb['content'], vector_str, metadata_json))
-                
-                # Insert with conflict handling
-                await conn.executemany(f"""
+                # COPY can't skip conflicting rows, so stream the batch into a
+                # session-local staging table and resolve conflicts on the way in
+                await conn.execute(f"""
+                    CREATE TEMP TABLE IF NOT EXISTS {self.staging_table_name} (
+                        content TEXT,
+                        embedding vector(1024),
+                        metadata JSONB
+                    ) ON COMMIT DELETE ROWS
+                """)
+                await conn.copy_records_to_table(
+                    self.staging_table_name,
+                    records=records,
+                    columns=['content', 'embedding', 'metadata']
+                )
+                await conn.execute(f"""
                     INSERT INTO {self.table_name} (content, embedding, metadata)
-                    VALUES ($1, $2::vector, $3::jsonb)
+                    SELECT DISTINCT ON (metadata->>'filename', content) content, embedding, metadata
+                    FROM {self.staging_table_name}
                     ON CONFLICT DO NOTHING
-                """, batch_data)
+                """)
+            
+            for filename in {emb.get('metadata', {}).get('filename') for emb in embeddings}:
+                self._exists_cache[(self.store_name, filename)] = True
+            
+            # Keep an already-loaded cache in step with committed rows
+            if self._cache is not None and self._cache.loaded:
+                self._cache.add([
+                    (None, emb['content'], emb['embedding'], emb.get('metadata', {}))
+                    for emb in embeddings
+                ])
                 
         except (asyncio.CancelledError, asyncio.TimeoutError):
             # Handle cancellation gracefully
@@ -151,39 +391,78 @@ class PostgreSQLVectorStore:
                 except (asyncio.CancelledError, Exception):
                     pass
         
-    async def search(self, query_vector: np.ndarray, top_k: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
-        """Enhanced search with context window for better retrieval."""
+    async def _ensure_cache(self) -> bool:
+        """Lazily load the in-memory embedding cache, returning whether it is usable."""
+        if self._cache is None:
+            return False
+        if self._cache.loaded:
+            return True
+        
+        async with self._cache_lock:
+            if not self._cache.loaded:
+                try:
+                    pool = await self._get_pool()
+                    async with pool.acquire() as conn:
+                        await self._cache.load(conn, self.table_name)
+                except Exception as e:
+                    print(f"Embedding cache load failed, using DB search: {e}")
+                    self._cache = EmbeddingCache()
+                    return False
+        return True
+        
+    async def search(self, query_vector: np.ndarray, top_k: int = 10, offset: int = 0,
+                     min_similarity: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Enhanced search with context window for better retrieval.
+        
+        Rows at or below ``min_similarity`` are dropped in the query itself, so
+        they are neither transferred nor given a context window lookup.
+        """
+        if await self._ensure_cache():
+            return self._cache.search(query_vector, top_k=top_k, offset=offset, min_similarity=min_similarity)
+        
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             try:
-                await conn.execute(f"SET hnsw.ef_search = {settings.HNSW_EF_SEARCH}")
+                # HNSW returns at most ef_search rows, so never let it cut a page short.
+                # The pool already sets HNSW_EF_SEARCH; only deep pages need a larger value,
+                # set transaction-locally so the pooled connection keeps the default
+                candidates = self._candidate_count(top_k, offset)
+                ef_search = _ef_search_for(candidates)
+                raise_ef_search = ef_search > settings.HNSW_EF_SEARCH
                 
-                if isinstance(query_vector, np.ndarray):
-                    vector_list = query_vector.tolist()
-                else:
-                    vector_list = query_vector
+                vector = np.asarray(query_vector, dtype=np.float32)
                 
-                vector_str = '[' + ','.join(map(str, vector_list)) + ']'
+                # similarity = -(inner product), so similarity > t  <=>  (embedding <#> q) < -t
+                max_distance = float('inf') if min_similarity is None else -min_similarity
                 
-                rows = await conn.fetch(f"""
-                    SELECT content, (embedding <#> $1::vector) * -1 as similarity, metadata, id
-                    FROM {self.table_name}
-                    ORDER BY embedding <#> $1::vector
-                    LIMIT $2 OFFSET $3
-                """, vector_str, top_k, offset)
+                async with conn.transaction() if raise_ef_search else nullcontext():
+                    if raise_ef_search:
+                        await conn.execute(f"SET LOCAL hnsw.ef_search = {ef_search}")
+                    # Extract the line metadata keys server-side, and join each hit to its
+                    # neighbouring lines in the same round-trip
+                    rows = await conn.fetch(
+                        self._search_sql, vector, top_k, offset, max_distance, settings.CONTEXT_WINDOW_SIZE,
+                        candidates
+                    )
                 
                 results = []
                 for row in rows:
-                    metadata = json.loads(row['metadata']) if isinstance(row['metadata'], str) else row['metadata']
-                    
-                    # Get context window (surrounding lines)
-                    context_content = await self._get_context_window(conn, row, metadata)
+                    # Surrounding lines, falling back to the hit itself
+                    context_content = row['context']
+                    if not context_content:
+                        context_content = row['content']
+                    elif len(context_content) > settings.MAX_CONTEXT_LENGTH:
+                        context_content = context_content[:settings.MAX_CONTEXT_LENGTH] + '...'
                     
                     results.append({
                         'content': context_content,
                         'original_content': row['content'],
                         'similarity': float(row['similarity']),
-                        'metadata': metadata,
+                        'metadata': {
+                            key: row[key]
+                            for key in self.METADATA_KEYS
+                            if row[key] is not None
+                        },
                         'id': row['id']
                     })
                 return results
@@ -191,57 +470,55 @@ class PostgreSQLVectorStore:
                 print(f"Search failed: {e}")
                 return []
     
-    async def _get_context_window(self, conn, row, metadata) -> str:
-        """Get surrounding lines for better context."""
-        try:
-            filename = metadata.get('filename', '')
-            line_number = metadata.get('line_number', 0)
-            
-            if not filename or not line_number:
-                return row['content']
-            
-            # Get surrounding lines from same document
-            window_size = settings.CONTEXT_WINDOW_SIZE
-            context_rows = await conn.fetch(f"""
-                SELECT content, metadata
-                FROM {self.table_name}
-                WHERE metadata->>'filename' = $1
-                AND CAST(metadata->>'line_number' AS INTEGER) BETWEEN $2 AND $3
-                ORDER BY CAST(metadata->>'line_number' AS INTEGER)
-            """, filename, line_number - window_size, line_number + window_size)
-            
-            if context_rows:
-                context_lines = [r['content'] for r in context_rows]
-                full_context = ' '.join(context_lines)
-                
-                # Limit context length
-                if len(full_context) > settings.MAX_CONTEXT_LENGTH:
-                    full_context = full_context[:settings.MAX_CONTEXT_LENGTH] + '...'
+    async def measure_recall(self, query_vectors: List[np.ndarray], top_k: int = 15) -> float:
+        """Average recall@top_k of the HNSW index against an exact scan, for tuning ef_search."""
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            try:
+                recalls = []
+                for query_vector in query_vectors:
+                    vector = np.asarray(query_vector, dtype=np.float32)
+                    
+                    async with conn.transaction():
+                        await conn.execute(f"SET LOCAL hnsw.ef_search = {_ef_search_for(top_k)}")
+                        approx = await conn.fetch(f"""
+                            SELECT id FROM {self.table_name}
+                            ORDER BY {self._ann_order} LIMIT $2
+                        """, vector, top_k)
+                    
+                    async with conn.transaction():
+                        # Force the exact sequential scan as ground truth
+                        await conn.execute("SET LOCAL enable_indexscan = off")
+                        exact = await conn.fetch(f"""
+                            SELECT id FROM {self.table_name}
+                            ORDER BY embedding <#> $1::vector LIMIT $2
+                        """, vector, top_k)
+                    
+                    if exact:
+                        exact_ids = {row['id'] for row in exact}
+                        recalls.append(len(exact_ids & {row['id'] for row in approx}) / len(exact_ids))
                 
-                return full_context
-            
-            return row['content']
-            
-        except Exception as e:
-            print(f"Context window failed: {e}")
-            return row['content']
+                return sum(recalls) / len(recalls) if recalls else 0.0
+            except Exception as e:
+                print(f"Recall measurement failed: {e}")
+                return 0.0
     
-    async def get_total_count(self, query_vector: np.ndarray, threshold: float = 0.3) -> int:
-        """Get total count of results above threshold."""
+    async def get_total_count(self, query_vector: np.ndarray, threshold: float = 0.3, limit: int = 1000) -> int:
+        """Get total count of results above threshold.
+        
+        Only the ``limit`` nearest neighbours from the HNSW index are counted, so
+        the result is approximate and capped at ``limit`` rather than a full scan.
+        """
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             try:
-                if isinstance(query_vector, np.ndarray):
-                    vector_list = query_vector.tolist()
-                else:
-                    vector_list = query_vector
-                
-                vector_str = '[' + ','.join(map(str, vector_list)) + ']'
+                vector = np.asarray(query_vector, dtype=np.float32)
                 
-                count = await conn.fetchval(f"""
-                    SELECT COUNT(*) FROM {self.table_name}
-                    WHERE (embedding <#> $1::vector) * -1 > $2
-                """, vector_str, threshold)
+                async with conn.transaction():
+                    # HNSW yields at most ef_search rows
+                    if limit > settings.HNSW_EF_SEARCH:
+                        await conn.execute(f"SET LOCAL hnsw.ef_search = {_ef_search_for(limit)}")
+                    count = await conn.fetchval(self._count_sql, vector, threshold, limit)
                 
                 return count or 0
             except Exception as e:
@@ -270,12 +547,5 @@ class PostgreSQLVectorStore:
                 }
     
     async def close(self):
-        """Close connection pool gracefully."""
-        if self._pool:
-            try:
-                await self._pool.close()
-            except (asyncio.CancelledError, Exception):
-                pass
-            finally:
-                self._pool = None
-    
+        """Release per-store state; the shared pool is closed by the store manager."""
+        self._cache = EmbeddingCache() if settings.RAG_CACHE_ENABLED else None
@@ -3,11 +3,12 @@
 import asyncio
 from typing import Dict, List, Any
 from app.config.langgraph_config import langgraph_config
-from app.core.vector_store.postgresql_store import PostgreSQLVectorStore
+from app.core.vector_store.postgresql_store import PostgreSQLVectorStore, get_shared_pool, close_shared_pool
 
 class VectorStoreManager:
     def __init__(self):
         self.stores: Dict[str, PostgreSQLVectorStore] = {}
+        self._init_lock = asyncio.Lock()
         self.department_keywords = self._build_department_keywords()
     
     def _build_department_keywords(self) -> Dict[str, List[str]]:
@@ -17,17 +18,28 @@ class VectorStoreManager:
         }
     
     async def initialize_all_stores(self):
-        """Create single document vector store automatically."""
-        # print("Initializing document vector store...")  # Reduce logs
+        """Create any missing document vector store; existing stores (and their caches) are kept."""
+        if all(dept_name in self.stores for dept_name in langgraph_config.VECTOR_STORES):
+            return
         
-        for dept_name, config in langgraph_config.VECTOR_STORES.items():
-            # print(f"Creating vector store: {dept_name}")  # Reduce logs
-            store = PostgreSQLVectorStore(dept_name)
-            await store.create_store()
-            self.stores[dept_name] = store
-            # print(f"Created {dept_name}: {config['description']}")  # Reduce logs
-        
-        print(f"Vector stores ready: {len(self.stores)}")
+        async with self._init_lock:
+            # print("Initializing document vector store...")  # Reduce logs
+            await get_shared_pool()
+            
+            for dept_name, config in langgraph_config.VECTOR_STORES.items():
+                if dept_name in self.stores:
+                    continue
+                # print(f"Creating vector store: {dept_name}")  # Reduce logs
+                store = PostgreSQLVectorStore(dept_name)
+                await store.create_store()
+                self.stores[dept_name] = store
+                # print(f"Created {dept_name}: {config['description']}")  # Reduce logs
+            
+            print(f"Vector stores ready: {len(self.stores)}")
+    
+    async def warm_up_stores(self):
+        """Prime pooled connections and HNSW indexes for every store."""
+        await asyncio.gather(*(store.warm_up() for store in self.stores.values()))
     
     def route_to_department(self, content: str, filename: str = "") -> str:
         """Route all content to single documents store."""
@@ -58,6 +70,7 @@ class VectorStoreManager:
             except Exception:
                 pass
         self.stores.clear()
+        await close_shared_pool()
 
 # Global store manager
 store_manager = VectorStoreManager()
\ No newline at end of file
@@ -1,18 +1,31 @@
 """LangGraph RAG workflow with agentic decision making."""
 
+import asyncio
+import re
 from typing import Dict, Any, List, Annotated
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_openai import ChatOpenAI, AzureChatOpenAI
+from app.config.settings import settings
 from app.core.embeddings.bge3_generator import bge3_generator
-from pydantic import BaseModel
+from app.core.llm_http import llm_http_kwargs
+from dataclasses import dataclass, field
 
-class RAGWorkflowState(BaseModel):
+# Department keywords matched as substrings in a single pass over the query
+DEPARTMENT_ROUTER = re.compile(
+    r'(?P<tech>technical|code|api|system)'
+    r'|(?P<business>business|strategy|market)'
+    r'|(?P<legal>legal|compliance|regulation)',
+    re.IGNORECASE
+)
+
+@dataclass(slots=True)
+class RAGWorkflowState:
     messages: Annotated[List[BaseMessage], add_messages]
     query: str = ""
     confidence: float = 0.0
-    vector_stores: List[str] = []
+    vector_stores: List[str] = field(default_factory=list)
     retrieved_context: str = ""
     final_response: str = ""
     llm_choice: str = ""
@@ -21,8 +34,8 @@ def create_rag_workflow():
     """Create the main RAG workflow using LangGraph."""
     
     # Initialize LLMs and embeddings
-    fast_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
-    smart_llm = ChatOpenAI(model="gpt-4o", temperature=0.2)
+    fast_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=settings.OPENAI_API_KEY, **llm_http_kwargs())
+    smart_llm = ChatOpenAI(model="gpt-4o", temperature=0.2, api_key=settings.OPENAI_API_KEY, **llm_http_kwargs())
     embeddings = bge3_generator
     
     def analyze_query(state: RAGWorkflowState) -> RAGWorkflowState:
@@ -40,30 +53,30 @@ def create_rag_workflow():
     
     def route_vector_stores(state: RAGWorkflowState) -> RAGWorkflowState:
         """Route to appropriate vector stores based on content."""
-        query_lower = state.query.lower()
-        
-        stores = []
-        if any(term in query_lower for term in ["technical", "code", "api", "system"]):
-            stores.append("tech")
-        if any(term in query_lower for term in ["business", "strategy", "market"]):
-            stores.append("business")
-        if any(term in query_lower for term in ["legal", "compliance", "regulation"]):
-            stores.append("legal")
+        matched = {match.lastgroup for match in DEPARTMENT_ROUTER.finditer(state.query)}
         
+        stores = [store for store in ("tech", "business", "legal") if store in matched]
         state.vector_stores = stores if stores else ["general"]
         return state
     
-    def retrieve_documents(state: RAGWorkflowState) -> RAGWorkflowState:
-        """Retrieve relevant documents using HNSW search."""
-        # Generate embedding for query
-        query_embedding = embeddings.generate_single_embedding(state.query)
+    async def retrieve_documents(state: RAGWorkflowState) -> RAGWorkflowState:
+        """Retrieve relevant documents using HNSW search across the routed stores concurrently."""
+        from app.core.vector_store.store_manager import store_manager
+        
+        # Generate embedding for query once, off the event loop
+        query_embedding = await asyncio.to_thread(embeddings.generate_single_embedding, state.query)
+        
+        if not store_manager.stores:
+            state.retrieved_context = ""
+            return state
         
-        # Simulate HNSW retrieval from multiple stores
-        retrieved_docs = []
-        for store in state.vector_stores:
-            # In real implementation, this would query PostgreSQL with HNSW
-            retrieved_docs.append(f"Document from {store} store relevant to: {state.query}")
+        # Unknown departments fall back to the same store, so search each store once
+        stores = {id(store): store for store in map(store_manager.get_store, state.vector_stores)}
+        results = await asyncio.gather(*(
+            store.search(query_embedding, top_k=5) for store in stores.values()
+        ))
         
+        retrieved_docs = [result['content'] for store_results in results for result in store_results]
         state.retrieved_context = "\n".join(retrieved_docs)
         return state
     
@@ -1,7 +1,7 @@
 """Chat and memory data models."""
 
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -11,6 +11,8 @@ class FeedbackType(Enum):
     NEUTRAL = "neutral"
 
 class ChatMessage(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     role: str  # "user" or "assistant"
     content: str
     timestamp: datetime
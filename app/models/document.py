@@ -1,7 +1,7 @@
 """Document data models."""
 
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -18,6 +18,8 @@ class DocumentStatus(str, Enum):
     FAILED = "failed"
 
 class Document(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: Optional[str] = None
     filename: str
     format: DocumentFormat
@@ -28,6 +30,8 @@ class Document(BaseModel):
     updated_at: Optional[datetime] = None
 
 class DocumentUploadResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     document_id: str
     filename: str
     status: DocumentStatus
@@ -0,0 +1,54 @@
+"""Gunicorn settings for multi-worker production runs (launched by start_server.py)."""
+
+import os
+from app.config.settings import settings
+
+from uvicorn.workers import UvicornWorker
+
+class ProductionUvicornWorker(UvicornWorker):
+    """UvicornWorker with the limits start_server.py applies to plain uvicorn workers."""
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "limit_concurrency": 1000, "lifespan": "on"}
+
+worker_class = "gunicorn_conf.ProductionUvicornWorker"
+keepalive = 30
+reuse_port = True  # SO_REUSEPORT: a replacement master can bind while the old one drains
+accesslog = None  # Access logging is left to the reverse proxy
+
+def on_starting(server):
+    """Turn off the embedding cache for multi-worker runs, before any worker forks.
+    
+    Each worker would load its own copy and never see rows inserted through
+    the other workers, so searches would silently miss fresh uploads.
+    """
+    if settings.RAG_CACHE_ENABLED and server.cfg.workers > 1:
+        print("RAG_CACHE_ENABLED ignored: per-worker caches go stale across multiple workers")
+        settings.RAG_CACHE_ENABLED = False
+
+def pre_fork(server, worker):
+    """Choose the CPU for a new worker: the first one no live worker holds.
+    
+    Runs in the master, so the choice stays recorded on the worker object in
+    server.WORKERS and restarted workers (max_requests, crashes) fill the gap
+    their predecessor left instead of doubling up on a busy CPU.
+    """
+    cpus = sorted(os.sched_getaffinity(0))
+    held = [getattr(live, "cpu", None) for live in server.WORKERS.values()]
+    # Least-held CPU, lowest number first; only shares once there are more workers than CPUs
+    worker.cpu = min(cpus, key=held.count)
+
+def post_fork(server, worker):
+    """Pin each worker to its CPU so its caches stay warm for similarity compute.
+    
+    The app is imported after the fork, so capping OpenMP threads here keeps
+    torch from starting a core's worth of threads on its single CPU.
+    """
+    os.sched_setaffinity(0, {worker.cpu})
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+def child_exit(server, worker):
+    """Drop the readiness file of a worker that died without running its shutdown."""
+    if settings.READY_FILE:
+        try:
+            os.unlink(f"{settings.READY_FILE}.{worker.pid}")
+        except FileNotFoundError:
+            pass
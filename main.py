@@ -1,12 +1,60 @@
 """LangGraph Agentic RAG System."""
 
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import asyncio
+import os
+import sys
 from app.api.v1.router import api_router
-from app.core.startup import startup_handler
+from app.config.settings import settings
+from app.core.startup import initialize_vector_stores, warm_up_models
+from app.core.log_setup import configure_logging
 
-app = FastAPI(title="LangGraph Agentic RAG", version="1.0.0")
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize stores and models before serving; close connections on shutdown."""
+    if sys.version_info >= (3, 12):
+        # Tasks run synchronously up to their first real suspension (cache hits, ready pool connections)
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
+    # Block until stores and the model are ready so the first request doesn't pay for them.
+    # Both report failure rather than raising, so fail startup here instead of serving cold
+    if not await initialize_vector_stores():
+        raise RuntimeError("Vector store initialization failed")
+    if not await warm_up_models():
+        raise RuntimeError("Embedding model warmup failed")
+    
+    # One file per worker so a worker shutting down doesn't unready its siblings;
+    # exec probes can check for any of them instead of polling an HTTP endpoint
+    ready_file = Path(f"{settings.READY_FILE}.{os.getpid()}") if settings.READY_FILE else None
+    if ready_file:
+        ready_file.touch()
+    
+    yield
+    
+    if ready_file:
+        ready_file.unlink(missing_ok=True)
+    
+    try:
+        from app.core.vector_store.store_manager import store_manager
+        await store_manager.close_all_stores()
+    except Exception:
+        pass
+    
+    from app.core.llm_http import close_llm_http_clients
+    await close_llm_http_clients()
+    
+    # Only loaded once an upload has run; importing it just to shut down would pull in camelot
+    pdf_extractor_module = sys.modules.get("app.core.document.pdf_extractor")
+    if pdf_extractor_module is not None:
+        await asyncio.to_thread(pdf_extractor_module.shutdown_ocr_pool)
+
+app = FastAPI(title="LangGraph Agentic RAG", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -17,21 +65,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(api_router, prefix="/api/v1")
+# Compress JSON answers and sources; tiny responses aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-@app.on_event("startup")
-async def startup():
-    """Initialize vector stores on startup."""
-    startup_handler()
-
-@app.on_event("shutdown")
-async def shutdown():
-    """Graceful shutdown - close database connections."""
-    try:
-        from app.core.vector_store.store_manager import store_manager
-        await store_manager.close_all_stores()
-    except Exception:
-        pass
+app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
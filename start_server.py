@@ -1,36 +1,117 @@
 """Startup script for the Agentic RAG System."""
 
-import uvicorn
 import sys
 import os
-from pathlib import Path
 
-# Add the current directory to Python path
-current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir))
+# Emoji only on a UTF-8 terminal; pipes and legacy consoles get ASCII markers
+USE_EMOJI = sys.stderr.isatty() and (sys.stderr.encoding or "").lower().startswith("utf")
+ROCKET, BOOKS, LINK, CHART, WAVE, CROSS = (
+    ("🚀", "📚", "🔗", "📊", "👋", "❌") if USE_EMOJI else ("[*]", "[*]", "[>]", "[>]", "[-]", "[!]")
+)
+
+def _server_runtime():
+    """Prefer uvloop and httptools (bundled with uvicorn[standard]); uvloop is unavailable on Windows.
+    
+    uvloop is installed as the process-wide loop policy, so loops created
+    outside uvicorn's server (the reload supervisor included) use it too.
+    """
+    try:
+        import asyncio
+        import uvloop
+        # Same effect as uvloop.install(), which is deprecated on Python 3.12+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "auto"
+    return loop, http
+
+def _exec_pinned_workers(host: str, port: int, workers: int) -> None:
+    """Replace this process with Gunicorn so workers get CPU affinity (Linux only).
+
+    Returns without doing anything when Gunicorn or sched_setaffinity is unavailable.
+    Workers get the same limit_concurrency through gunicorn_conf's worker class.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return
+    os.execvp("gunicorn", [
+        "gunicorn", "main:app",
+        "-c", "python:gunicorn_conf",
+        "--bind", f"{host}:{port}",
+        "--workers", str(workers)
+    ])
 
 def main():
     """Start the FastAPI server."""
-    print("🚀 Starting Agentic RAG System...")
-    print("📚 Intelligent document management with HNSW indexing")
-    print("🔗 API Documentation: http://localhost:8000/docs")
-    print("📊 Health Check: http://localhost:8000/health")
-    print("\n" + "="*50)
+    loop, http = _server_runtime()
+    import uvicorn
     
-    try:
-        uvicorn.run(
-            "app.main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info",
-            access_log=True
+    # Loopback unless the deployment opts in, e.g. HOST=0.0.0.0 from the orchestrator
+    host = os.environ.get("HOST", "127.0.0.1")
+    port = int(os.environ.get("PORT", "8000"))
+    
+    banner = "\n".join([
+        f"{ROCKET} Starting Agentic RAG System...",
+        f"{BOOKS} Intelligent document management with HNSW indexing",
+        f"{LINK} API Documentation: http://localhost:{port}/docs",
+        f"{CHART} Health Check: http://localhost:{port}/health",
+        "",
+        "=" * 50
+    ])
+    sys.stderr.write(banner + "\n")
+    
+    if os.environ.get("APP_ENV") == "prod":
+        # No file watcher, and access logging is left to the reverse proxy (nginx/traefik)
+        # One process per core, capped by WEB_CONCURRENCY; reload and workers are mutually exclusive
+        workers = min(os.cpu_count() or 1, int(os.environ.get("WEB_CONCURRENCY", 4)))
+        mode_options = dict(
+            reload=False,
+            access_log=False,
+            workers=workers,
+            limit_concurrency=1000,
+            timeout_keep_alive=30
         )
+    else:
+        mode_options = dict(reload=True, reload_delay=0.5, access_log=True)
+    
+    options = dict(
+        host=host,
+        port=port,
+        log_level="info",
+        loop=loop,
+        http=http,
+        # Fail fast if store/model warmup can't run rather than serving cold
+        lifespan="on",
+        **mode_options
+    )
+    try:
+        if mode_options.get("workers", 1) > 1:
+            _exec_pinned_workers(host, port, mode_options["workers"])
+        
+        if options["reload"] or options.get("workers", 1) > 1:
+            # Reload and multi-worker modes need uvicorn.run's supervisor process
+            uvicorn.run("main:app", **options)
+        else:
+            server = uvicorn.Server(uvicorn.Config("main:app", **options))
+            server.run()
+            if not server.started:
+                # Lifespan startup failed; exit non-zero like uvicorn.run does
+                sys.exit(3)
     except KeyboardInterrupt:
-        print("\n👋 Server stopped by user")
-    except Exception as e:
-        print(f"\n❌ Server failed to start: {e}")
+        print(f"\n{WAVE} Server stopped by user")
+    except (OSError, ImportError) as e:
+        # Port in use, missing dependency or app module; non-zero so orchestrators restart
+        print(f"\n{CROSS} Server failed to start: {e}")
         print("Please check your configuration and dependencies.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""Tests that both abbreviation/typo replacement paths agree."""
+
+import pytest
+
+from app.core.query_processor import QueryProcessor
+
+CASES = [
+    ("sub-sec 4 of the act", "subsection 4 of the act"),
+    ("sec 12 r/w art 21", "section 12 read with article 21"),
+    ("s. 10 u/s 5", "section 10 under section 5"),
+    ("s.10", "s.10"),
+    ("obligations w.r.t. the committe", "obligations with respect to. the committee"),
+    ("artistic parameters", "artistic parameters"),
+    ("recieve notice viz. form a", "receive notice namely. form a"),
+]
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return QueryProcessor()
+
+
+@pytest.mark.parametrize("query, expected", CASES)
+def test_regex_fallback(processor, query, expected):
+    assert processor._replace_terms_regex(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", CASES)
+def test_flashtext_matches_regex_fallback(processor, query, expected):
+    pytest.importorskip("flashtext")
+
+    assert processor._keyword_processor.replace_keywords(query) == expected
+    assert processor._keyword_processor.replace_keywords(query) == processor._replace_terms_regex(query)
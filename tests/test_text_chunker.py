@@ -0,0 +1,29 @@
+"""Tests for TextChunker overlap and sentence-boundary handling."""
+
+from app.core.document.text_chunker import TextChunker
+
+
+def test_overlap_never_repeats_previous_chunk_suffix():
+    text = "Hello world this is a test. Another sentence follows here and keeps going on."
+    chunks = TextChunker(chunk_size=50, overlap=5).chunk_text(text)
+
+    assert chunks[0] == "Hello world this is a test."
+    for previous, current in zip(chunks, chunks[1:]):
+        assert not previous.endswith(current)
+    assert chunks[-1].endswith("going on.")
+
+
+def test_text_that_fits_one_chunk_is_not_repeated():
+    chunks = TextChunker(chunk_size=50, overlap=5).chunk_text("Hello world this is a test.")
+
+    assert chunks == ["Hello world this is a test."]
+
+
+def test_every_chunk_ends_past_the_previous_one():
+    # Numbered words make each chunk's last word identify its end position
+    words = [f"w{i}{'.' if i % 4 == 3 else ''}" for i in range(60)]
+    chunks = TextChunker(chunk_size=40, overlap=3).chunk_text(" ".join(words))
+
+    ends = [int(chunk.split()[-1].strip("w.")) for chunk in chunks]
+    assert ends == sorted(set(ends))
+    assert ends[-1] == 59